@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
 
-import ctypes, ctypes.util, logging, os.path, getopt, sys, subprocess, select, time, math, configparser
+import ctypes, ctypes.util, logging, os.path, sys, subprocess, select, time, math, functools
 from fcntl import ioctl
+from struct import unpack_from
 from threading import Thread
+from dataclasses import dataclass, field
+from enum import IntEnum
 
 ghurl = 'https://github.com/soyersoyer/cameractrls'
 version = 'v0.6.7'
@@ -15,80 +18,145 @@ v4ldirs = {
 }
 
 
+# sorted by name, but the same device is the same path
+@dataclass(eq=False)
 class Device:
-    def __init__(self, name, path, real_path, driver):
-        self.name = name
-        self.path = path
-        self.real_path = real_path
-        self.driver = driver
+    __slots__ = ('name', 'path', 'real_path', 'driver')
+    name: str
+    path: str
+    real_path: str
+    driver: str
 
-    def _is_valid_operand(self, other):
-        return (hasattr(other, "name") and
-                hasattr(other, "path"))
+    def __post_init__(self):
+        self.path = sys.intern(self.path)
+        self.driver = sys.intern(self.driver)
 
     def __lt__(self, other):
-        if not self._is_valid_operand(other):
+        if not isinstance(other, Device):
             return NotImplemented
         return self.name < other.name
 
     def __eq__(self, other):
-        if not self._is_valid_operand(other):
+        if not isinstance(other, Device):
             return NotImplemented
         return self.path == other.path
 
+    def __hash__(self):
+        return hash(self.path)
+
     def __str__(self):
         return f'"{self.name}" at {self.path}{" -> " + self.real_path if self.real_path != self.path else ""}'
 
 def get_devices(dirs):
-    devices = []
-    resolved_devices = []
+    # the first path wins for every real device, the dirs are in preference order
+    resolved_devices = {}
+    realpath = os.path.realpath
     for dir, prefix in dirs.items():
         if not os.path.isdir(dir):
             continue
-        for device in os.listdir(dir):
-            if not device.startswith(prefix):
-                continue
-            device = dir + device
-            resolved = device if not os.path.islink(device) else os.path.abspath(dir + os.readlink(device))
-            if resolved in resolved_devices:
-                continue
-            caps = get_device_capability(device)
-            if not(caps.device_caps & V4L2_CAP_VIDEO_CAPTURE):
-                continue
-            name = f'{caps.card.decode()} ({resolved})'
-            devices.append(Device(name, device, resolved, str(caps.driver)))
-            resolved_devices.append(resolved)
+        with os.scandir(dir) as entries:
+            for entry in entries:
+                if not entry.name.startswith(prefix):
+                    continue
+                resolved = realpath(entry.path) if entry.is_symlink() else entry.path
+                resolved_devices.setdefault(resolved, entry.path)
+
+    # query every real device only once, even the non capture ones
+    devices = []
+    caps = v4l2_capability()
+    cap_video_capture = V4L2_CAP_VIDEO_CAPTURE
+    for resolved, device in resolved_devices.items():
+        get_device_capability(device, caps)
+        if not(caps.device_caps & cap_video_capture):
+            continue
+        name = f'{caps.card.decode()} ({resolved})'
+        devices.append(Device(name, device, resolved, str(caps.driver)))
     devices.sort()
     return devices
 
-ptz_hw_executables = [
-    f'{sys.path[0]}/cameraptzspnav.py',
-    f'{sys.path[0]}/cameraptzgame.py',
-    f'{sys.path[0]}/cameraptzmidi.py',
-]
+# the directory of the scripts, resolved like sys.path[0] when cameractrls.py is run through a symlink
+@functools.lru_cache(maxsize=None)
+def get_install_dir():
+    return os.path.dirname(os.path.realpath(__file__))
+
+@functools.lru_cache(maxsize=None)
+def get_ptz_hw_executables():
+    base = get_install_dir()
+    return [
+        os.path.join(base, 'cameraptzspnav.py'),
+        os.path.join(base, 'cameraptzgame.py'),
+        os.path.join(base, 'cameraptzmidi.py'),
+    ]
 
 def exec_and_get_lines(params):
-    return subprocess.run(params, capture_output=True).stdout.splitlines()
+    with subprocess.Popen(params, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL) as p:
+        return [line.rstrip(b'\n') for line in p.stdout]
 
 def get_ptz_hw_controllers(executables):
-    controllers = []
+    # only needed with PTZ hw controllers, keep it out of the import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    cmds = []
     for cmd in executables:
         if not os.access(cmd, os.X_OK):
             logging.warning(f'{cmd} is not an executable')
             continue
-        controllers += [
-            PTZHWController(cmd, c.decode())
-            for c in exec_and_get_lines([cmd, '-l'])
-        ]
-    return controllers
+        cmds.append(cmd)
+
+    # list the controllers in parallel, every executable starts its own interpreter
+    with ThreadPoolExecutor(max_workers=max(1, len(cmds))) as executor:
+        results = executor.map(lambda cmd: (cmd, exec_and_get_lines([cmd, '-l'])), cmds)
+
+    return [
+        PTZHWController(cmd, c.decode())
+        for cmd, lines in results
+        for c in lines
+    ]
 
+# one thread watches the exits and the stderr of every PTZ hw controller process
+class PTZHWReactor():
+    __slots__ = ('selector',)
+
+    def __init__(self):
+        # only needed with PTZ hw controllers, keep it out of the import time
+        import selectors
+
+        self.selector = selectors.DefaultSelector()
+        Thread(target=self.run, daemon=True).start()
+
+    def register(self, fileobj, cb):
+        import selectors
+
+        self.selector.register(fileobj, selectors.EVENT_READ, cb)
+
+    def unregister(self, fileobj):
+        try:
+            self.selector.unregister(fileobj)
+        except (KeyError, ValueError):
+            pass
+
+    # thread
+    def run(self):
+        while True:
+            for key, mask in self.selector.select():
+                key.data()
+
+@functools.lru_cache(maxsize=None)
+def get_ptz_hw_reactor():
+    return PTZHWReactor()
+
+# notify_err and notify_end are called from the reactor thread
 class PTZHWControllers():
-    def __init__(self, video_device, toggle_cb, notify_err, notify_end):
-        self.controllers = get_ptz_hw_controllers(ptz_hw_executables)
+    __slots__ = ('controllers', 'video_device', 'notify_err', 'notify_end', 'stderr_bufs')
+
+    def __init__(self, video_device, notify_err, notify_end):
+        self.controllers = get_ptz_hw_controllers(get_ptz_hw_executables())
         self.video_device = video_device
-        self.toggle_cb = toggle_cb
         self.notify_err = notify_err
         self.notify_end = notify_end
+        # the stderr of the running controllers are drained continuously,
+        # so a chatty controller can't block on a full pipe
+        self.stderr_bufs = {}
     
     def get_names(self):
         return [c.id for c in self.controllers]
@@ -98,7 +166,13 @@ class PTZHWControllers():
         if c.is_running():
             c.terminate()
         p = c.run(self.video_device)
-        self.toggle_cb(self.check_ptz_open, p, i)
+        pidfd = c.pidfd
+        os.set_blocking(p.stderr.fileno(), False)
+        self.stderr_bufs[p] = bytearray()
+        reactor = get_ptz_hw_reactor()
+        reactor.register(p.stderr, lambda: self.on_stderr(p, i, pidfd))
+        if pidfd is not None:
+            reactor.register(pidfd, lambda: self.on_exit(p, i, pidfd))
 
     def stop(self, i):
         c = self.controllers[i]
@@ -111,31 +185,69 @@ class PTZHWControllers():
         else:
             self.stop(i)
 
-    def check_ptz_open(self, p, i):
-        # if process returned
-        if p.poll() is not None:
-            (stdout, stderr) = p.communicate()
-            errstr = stderr.decode()
-            sys.stderr.write(errstr)
-            if p.returncode != 0 and p.returncode != -15:
-                self.notify_err(errstr.strip())
-            self.notify_end(i)
-            # False removes the timeout
-            return False
-        return True
+    def on_stderr(self, p, i, pidfd):
+        if p not in self.stderr_bufs:
+            return
+        if not self.read_stderr(p):
+            get_ptz_hw_reactor().unregister(p.stderr)
+            # without pidfd the end of stderr signals the exit
+            if pidfd is None:
+                p.wait()
+                self.finish(p, i)
+
+    # the pidfd becomes readable when the process exits
+    def on_exit(self, p, i, pidfd):
+        get_ptz_hw_reactor().unregister(pidfd)
+        os.close(pidfd)
+        p.wait()
+        self.finish(p, i)
+
+    def finish(self, p, i):
+        if p not in self.stderr_bufs:
+            return
+        self.read_stderr(p)
+        get_ptz_hw_reactor().unregister(p.stderr)
+        p.stderr.close()
+        errstr = bytes(self.stderr_bufs.pop(p)).decode()
+        sys.stderr.write(errstr)
+        if p.returncode != 0 and p.returncode != -15:
+            self.notify_err(errstr.strip())
+        self.notify_end(i)
+
+    # returns False on EOF
+    def read_stderr(self, p):
+        try:
+            while True:
+                data = os.read(p.stderr.fileno(), 4096)
+                if not data:
+                    return False
+                self.stderr_bufs[p] += data
+        except BlockingIOError:
+            return True
 
     def terminate_all(self):
         for c in self.controllers:
             c.terminate()
 
 class PTZHWController():
+    __slots__ = ('command', 'id', 'process', 'pidfd')
+
     def __init__(self, command, id):
         self.command = command
         self.id = id
         self.process = None
+        self.pidfd = None
     
     def run(self, video_device):
-        self.process = subprocess.Popen([self.command, '-c', self.id, '-d', video_device], stderr=subprocess.PIPE)
+        # no preexec_fn, so the child is spawned with vfork instead of a full fork of this process
+        self.process = subprocess.Popen([self.command, '-c', self.id, '-d', video_device],
+            stdin=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        try:
+            self.pidfd = os.pidfd_open(self.process.pid)
+        except (AttributeError, OSError) as e:
+            # python < 3.9 or kernel < 5.3, the end of stderr signals the exit
+            logging.debug(f'PTZHWController: pidfd_open failed: {e}')
+            self.pidfd = None
         return self.process
     
     def is_running(self):
@@ -162,11 +274,12 @@ _IOC_READ  = 2
 
 def _IOC(dir_, type_, nr, size):
     return (
-        ctypes.c_int32(dir_ << _IOC_DIRSHIFT).value |
-        ctypes.c_int32(ord(type_) << _IOC_TYPESHIFT).value |
-        ctypes.c_int32(nr << _IOC_NRSHIFT).value |
-        ctypes.c_int32(size << _IOC_SIZESHIFT).value)
+        (dir_ << _IOC_DIRSHIFT) |
+        (ord(type_) << _IOC_TYPESHIFT) |
+        (nr << _IOC_NRSHIFT) |
+        (size << _IOC_SIZESHIFT)) & 0xFFFFFFFF
 
+@functools.lru_cache(maxsize=None)
 def _IOC_TYPECHECK(t):
     return ctypes.sizeof(t)
 
@@ -199,34 +312,40 @@ class v4l2_capability(ctypes.Structure):
 VIDEO_MAX_PLANES = 8
 
 v4l2_buf_type = enum
-(V4L2_BUF_TYPE_VIDEO_CAPTURE) = list(range(1, 2))
+class V4L2BufType(IntEnum):
+    V4L2_BUF_TYPE_VIDEO_CAPTURE = 1
+globals().update(V4L2BufType.__members__)
 v4l2_memory = enum
-(V4L2_MEMORY_MMAP) = range(1, 2)
+class V4L2Memory(IntEnum):
+    V4L2_MEMORY_MMAP = 1
+globals().update(V4L2Memory.__members__)
 v4l2_field = enum
-(V4L2_FIELD_ANY) = range(1)
+class V4L2Field(IntEnum):
+    V4L2_FIELD_ANY = 0
+globals().update(V4L2Field.__members__)
 
 v4l2_colorspace = enum
-(
-    V4L2_COLORSPACE_DEFAULT,
-    V4L2_COLORSPACE_SMPTE170M,
-    V4L2_COLORSPACE_SMPTE240M,
-    V4L2_COLORSPACE_REC709,
-    V4L2_COLORSPACE_BT878,
-    V4L2_COLORSPACE_470_SYSTEM_M,
-    V4L2_COLORSPACE_470_SYSTEM_BG,
-    V4L2_COLORSPACE_JPEG,
-    V4L2_COLORSPACE_SRGB,
-    V4L2_COLORSPACE_OPRGB,
-    V4L2_COLORSPACE_BT2020,
-    V4L2_COLORSPACE_RAW,
-    V4L2_COLORSPACE_DCI_P3,
-) = range(13)
+class V4L2Colorspace(IntEnum):
+    V4L2_COLORSPACE_DEFAULT = 0
+    V4L2_COLORSPACE_SMPTE170M = 1
+    V4L2_COLORSPACE_SMPTE240M = 2
+    V4L2_COLORSPACE_REC709 = 3
+    V4L2_COLORSPACE_BT878 = 4
+    V4L2_COLORSPACE_470_SYSTEM_M = 5
+    V4L2_COLORSPACE_470_SYSTEM_BG = 6
+    V4L2_COLORSPACE_JPEG = 7
+    V4L2_COLORSPACE_SRGB = 8
+    V4L2_COLORSPACE_OPRGB = 9
+    V4L2_COLORSPACE_BT2020 = 10
+    V4L2_COLORSPACE_RAW = 11
+    V4L2_COLORSPACE_DCI_P3 = 12
+globals().update(V4L2Colorspace.__members__)
 
 V4L2_CAP_VIDEO_CAPTURE = 0x00000001
 V4L2_CAP_STREAMING = 0x04000000
 
 def v4l2_fourcc(a, b, c, d):
-    return ord(a) | (ord(b) << 8) | (ord(c) << 16) | (ord(d) << 24)
+    return int.from_bytes((a + b + c + d).encode('ascii'), 'little')
 
 V4L2_PIX_FMT_YUYV = v4l2_fourcc('Y', 'U', 'Y', 'V')
 V4L2_PIX_FMT_YVYU = v4l2_fourcc('Y', 'V', 'Y', 'U')
@@ -243,9 +362,13 @@ V4L2_PIX_FMT_RGB24 = v4l2_fourcc('R', 'G', 'B', '3')
 V4L2_PIX_FMT_BGR24 = v4l2_fourcc('B', 'G', 'R', '3')
 V4L2_PIX_FMT_RX24 = v4l2_fourcc('R', 'X', '2', '4')
 
+# the known pixel formats back to their fourcc strings
+FOURCC_NAMES = {
+    v: v.to_bytes(4, 'little').decode('ascii')
+    for k, v in list(globals().items()) if k.startswith('V4L2_PIX_FMT_')
+}
+FOURCC_CODES = {v: k for k, v in FOURCC_NAMES.items()}
 
-V4L2_BUF_TYPE_VIDEO_CAPTURE = 1
-V4L2_MEMORY_MMAP = 1
 
 class v4l2_fmtdesc(ctypes.Structure):
     _fields_ = [
@@ -434,11 +557,11 @@ class v4l2_buffer(ctypes.Structure):
     ]
 
 v4l2_frmsizetypes = enum
-(
-    V4L2_FRMSIZE_TYPE_DISCRETE,
-    V4L2_FRMSIZE_TYPE_CONTINUOUS,
-    V4L2_FRMSIZE_TYPE_STEPWISE,
-) = range(1, 4)
+class V4L2FrmSizeType(IntEnum):
+    V4L2_FRMSIZE_TYPE_DISCRETE = 1
+    V4L2_FRMSIZE_TYPE_CONTINUOUS = 2
+    V4L2_FRMSIZE_TYPE_STEPWISE = 3
+globals().update(V4L2FrmSizeType.__members__)
 
 
 class v4l2_frmsize_discrete(ctypes.Structure):
@@ -483,11 +606,11 @@ class v4l2_fract(ctypes.Structure):
     ]
 
 v4l2_frmivaltypes = enum
-(
-    V4L2_FRMIVAL_TYPE_DISCRETE,
-    V4L2_FRMIVAL_TYPE_CONTINUOUS,
-    V4L2_FRMIVAL_TYPE_STEPWISE,
-) = range(1, 4)
+class V4L2FrmIvalType(IntEnum):
+    V4L2_FRMIVAL_TYPE_DISCRETE = 1
+    V4L2_FRMIVAL_TYPE_CONTINUOUS = 2
+    V4L2_FRMIVAL_TYPE_STEPWISE = 3
+globals().update(V4L2FrmIvalType.__members__)
 
 
 class v4l2_frmival_stepwise(ctypes.Structure):
@@ -574,21 +697,22 @@ VIDIOC_ENUM_FRAMEINTERVALS = _IOWR('V', 75, v4l2_frmivalenum)
 # controls
 
 v4l2_ctrl_type = enum
-(
-    V4L2_CTRL_TYPE_INTEGER,
-    V4L2_CTRL_TYPE_BOOLEAN,
-    V4L2_CTRL_TYPE_MENU,
-    V4L2_CTRL_TYPE_BUTTON,
-    V4L2_CTRL_TYPE_INTEGER64,
-    V4L2_CTRL_TYPE_CTRL_CLASS,
-    V4L2_CTRL_TYPE_STRING,
-    V4L2_CTRL_TYPE_BITMASK,
-    V4L2_CTRL_TYPE_INTEGER_MENU,
-) = range(1, 10)
+class V4L2CtrlType(IntEnum):
+    V4L2_CTRL_TYPE_INTEGER = 1
+    V4L2_CTRL_TYPE_BOOLEAN = 2
+    V4L2_CTRL_TYPE_MENU = 3
+    V4L2_CTRL_TYPE_BUTTON = 4
+    V4L2_CTRL_TYPE_INTEGER64 = 5
+    V4L2_CTRL_TYPE_CTRL_CLASS = 6
+    V4L2_CTRL_TYPE_STRING = 7
+    V4L2_CTRL_TYPE_BITMASK = 8
+    V4L2_CTRL_TYPE_INTEGER_MENU = 9
+globals().update(V4L2CtrlType.__members__)
 
 V4L2_CTRL_FLAG_READ_ONLY = 0x0004
 V4L2_CTRL_FLAG_UPDATE = 0x0008
 V4L2_CTRL_FLAG_INACTIVE = 0x0010
+V4L2_CTRL_FLAG_WRITE_ONLY = 0x0040
 V4L2_CTRL_FLAG_NEXT_CTRL = 0x80000000
 V4L2_CTRL_FLAG_NEXT_COMPOUND = 0x40000000
 
@@ -705,98 +829,107 @@ V4L2_CTRL_ZEROERS = [
     V4L2_CID_ZOOM_CONTINUOUS,
 ]
 
-V4L2_CTRL_INFO = {
-    V4L2_CID_BRIGHTNESS: ('V4L2_CID_BRIGHTNESS', 'Picture brightness, or more precisely, the black level.'),
-    V4L2_CID_CONTRAST: ('V4L2_CID_CONTRAST', 'Picture contrast or luma gain.'),
-    V4L2_CID_SATURATION: ('V4L2_CID_SATURATION', 'Picture color saturation or chroma gain.'),
-    V4L2_CID_HUE: ('V4L2_CID_HUE', 'Hue or color balance.'),
-    V4L2_CID_AUTO_WHITE_BALANCE: ('V4L2_CID_AUTO_WHITE_BALANCE', 'Automatic white balance.'),
-    V4L2_CID_DO_WHITE_BALANCE: ('V4L2_CID_DO_WHITE_BALANCE', 'This is an action control. When set (the value is ignored), the device will do a white balance and then hold the current setting. Contrast this with the boolean V4L2_CID_AUTO_WHITE_BALANCE, which, when activated, keeps adjusting the white balance.'),
-    V4L2_CID_RED_BALANCE: ('V4L2_CID_RED_BALANCE', 'Red chroma balance.'),
-    V4L2_CID_BLUE_BALANCE: ('V4L2_CID_BLUE_BALANCE', 'Blue chroma balance.'),
-    V4L2_CID_GAMMA: ('V4L2_CID_GAMMA', 'Gamma adjust.'),
-    V4L2_CID_EXPOSURE: ('V4L2_CID_EXPOSURE', 'Exposure.'),
-    V4L2_CID_AUTOGAIN: ('V4L2_CID_AUTOGAIN', 'Automatic gain/exposure control.'),
-    V4L2_CID_GAIN: ('V4L2_CID_GAIN', 'Gain control.'),
-    V4L2_CID_HFLIP: ('V4L2_CID_HFLIP', 'Mirror the picture horizontally.'),
-    V4L2_CID_VFLIP: ('V4L2_CID_VFLIP', 'Mirror the picture vertically.'),
-    V4L2_CID_POWER_LINE_FREQUENCY: ('V4L2_CID_POWER_LINE_FREQUENCY', 'Enables a power line frequency filter to avoid flicker.'),
-    V4L2_CID_HUE_AUTO: ('V4L2_CID_HUE_AUTO', 'Enables automatic hue control by the device. The effect of setting V4L2_CID_HUE while automatic hue control is enabled is undefined, drivers should ignore such request.'),
-    V4L2_CID_WHITE_BALANCE_TEMPERATURE: ('V4L2_CID_WHITE_BALANCE_TEMPERATURE', 'This control specifies the white balance settings as a color temperature in Kelvin. A driver should have a minimum of 2800 (incandescent) to 6500 (daylight).'),
-    V4L2_CID_SHARPNESS: ('V4L2_CID_SHARPNESS', 'Adjusts the sharpness filters in a camera. The minimum value disables the filters, higher values give a sharper picture.'),
-    V4L2_CID_BACKLIGHT_COMPENSATION: ('V4L2_CID_BACKLIGHT_COMPENSATION', 'Adjusts the backlight compensation in a camera. The minimum value disables backlight compensation.'),
-    V4L2_CID_CHROMA_AGC: ('V4L2_CID_CHROMA_AGC', 'Chroma automatic gain control.'),
-    V4L2_CID_CHROMA_GAIN: ('V4L2_CID_CHROMA_GAIN', 'Adjusts the Chroma gain control (for use when chroma AGC is disabled).'),
-    V4L2_CID_COLOR_KILLER: ('V4L2_CID_COLOR_KILLER', 'Enable the color killer (i. e. force a black & white image in case of a weak video signal).'),
-    V4L2_CID_COLORFX: ('V4L2_CID_COLORFX', 'Selects a color effect.'),
-    V4L2_CID_AUTOBRIGHTNESS: ('V4L2_CID_AUTOBRIGHTNESS', 'Enable Automatic Brightness.'),
-    V4L2_CID_BAND_STOP_FILTER: ('V4L2_CID_BAND_STOP_FILTER', 'Switch the band-stop filter of a camera sensor on or off, or specify its strength. Such band-stop filters can be used, for example, to filter out the fluorescent light component.'),
-    V4L2_CID_ROTATE: ('V4L2_CID_ROTATE', 'Rotates the image by specified angle. Common angles are 90, 270 and 180. Rotating the image to 90 and 270 will reverse the height and width of the display window. It is necessary to set the new height and width of the picture using the VIDIOC_S_FMT ioctl according to the rotation angle selected'),
-    V4L2_CID_BG_COLOR: ('V4L2_CID_BG_COLOR', 'Sets the background color on the current output device. Background color needs to be specified in the RGB24 format. The supplied 32 bit value is interpreted as bits 0-7 Red color information, bits 8-15 Green color information, bits 16-23 Blue color information and bits 24-31 must be zero.'),
-    V4L2_CID_ILLUMINATORS_1: ('V4L2_CID_ILLUMINATORS_1', 'Switch on or off the illuminator 1 of the device (usually a microscope).'),
-    V4L2_CID_ILLUMINATORS_2: ('V4L2_CID_ILLUMINATORS_2', 'Switch on or off the illuminator 2 of the device (usually a microscope).'),
-    V4L2_CID_ALPHA_COMPONENT: ('V4L2_CID_ALPHA_COMPONENT', 'Sets the alpha color component. When a capture device (or capture queue of a mem-to-mem device) produces a frame format that includes an alpha component (e.g. packed RGB image formats) and the alpha value is not defined by the device or the mem-to-mem input data this control lets you select the alpha component value of all pixels. When an output device (or output queue of a mem-to-mem device) consumes a frame format that doesn’t include an alpha component and the device supports alpha channel processing this control lets you set the alpha component value of all pixels for further processing in the device.'),
-    V4L2_CID_COLORFX_CBCR: ('V4L2_CID_COLORFX_CBCR', 'Determines the Cb and Cr coefficients for V4L2_COLORFX_SET_CBCR color effect. Bits [7:0] of the supplied 32 bit value are interpreted as Cr component, bits [15:8] as Cb component and bits [31:16] must be zero.'),
-    V4L2_CID_COLORFX_RGB: ('V4L2_CID_COLORFX_RGB', 'Determines the Red, Green, and Blue coefficients for V4L2_COLORFX_SET_RGB color effect. Bits [7:0] of the supplied 32 bit value are interpreted as Blue component, bits [15:8] as Green component, bits [23:16] as Red component, and bits [31:24] must be zero.'),
-
-    V4L2_CID_EXPOSURE_AUTO: ('V4L2_CID_EXPOSURE_AUTO', 'Enables automatic adjustments of the exposure time and/or iris aperture. The effect of manual changes of the exposure time or iris aperture while these features are enabled is undefined, drivers should ignore such requests. Possible values are: AUTO: Automatic exposure time, automatic iris aperture. MANUAL: Manual exposure time, manual iris. SHUTTER_PRIORITY: Manual exposure time, auto iris. APERTURE_PRIORITY: Auto exposure time, manual iris.'),
-    V4L2_CID_EXPOSURE_ABSOLUTE: ('V4L2_CID_EXPOSURE_ABSOLUTE', 'Determines the exposure time of the camera sensor. The exposure time is limited by the frame interval. Drivers should interpret the values as 100 µs units, where the value 1 stands for 1/10000th of a second, 10000 for 1 second and 100000 for 10 seconds.'),
-    V4L2_CID_EXPOSURE_AUTO_PRIORITY: ('V4L2_CID_EXPOSURE_AUTO_PRIORITY', 'When V4L2_CID_EXPOSURE_AUTO is set to AUTO or APERTURE_PRIORITY, this control determines if the device may dynamically vary the frame rate. By default this feature is disabled (0) and the frame rate must remain constant.'),
-    V4L2_CID_PAN_RELATIVE: ('V4L2_CID_PAN_RELATIVE', 'This control turns the camera horizontally by the specified amount. The unit is undefined. A positive value moves the camera to the right (clockwise when viewed from above), a negative value to the left. A value of zero does not cause motion. This is a write-only control.'),
-    V4L2_CID_TILT_RELATIVE: ('V4L2_CID_TILT_RELATIVE', 'This control turns the camera vertically by the specified amount. The unit is undefined. A positive value moves the camera up, a negative value down. A value of zero does not cause motion. This is a write-only control.'),
-    V4L2_CID_PAN_RESET: ('V4L2_CID_PAN_RESET', 'When this control is set, the camera moves horizontally to the default position.'),
-    V4L2_CID_TILT_RESET: ('V4L2_CID_TILT_RESET', 'When this control is set, the camera moves vertically to the default position.'),
-    V4L2_CID_PAN_ABSOLUTE: ('V4L2_CID_PAN_ABSOLUTE', 'This control turns the camera horizontally to the specified position. Positive values move the camera to the right (clockwise when viewed from above), negative values to the left. Drivers should interpret the values as arc seconds, with valid values between -180 * 3600 and +180 * 3600 inclusive.'),
-    V4L2_CID_TILT_ABSOLUTE: ('V4L2_CID_TILT_ABSOLUTE', 'This control turns the camera vertically to the specified position. Positive values move the camera up, negative values down. Drivers should interpret the values as arc seconds, with valid values between -180 * 3600 and +180 * 3600 inclusive.'),
-    V4L2_CID_FOCUS_ABSOLUTE: ('V4L2_CID_FOCUS_ABSOLUTE', 'This control sets the focal point of the camera to the specified position. The unit is undefined. Positive values set the focus closer to the camera, negative values towards infinity.'),
-    V4L2_CID_FOCUS_RELATIVE: ('V4L2_CID_FOCUS_RELATIVE', 'This control moves the focal point of the camera by the specified amount. The unit is undefined. Positive values move the focus closer to the camera, negative values towards infinity. This is a write-only control.'),
-    V4L2_CID_FOCUS_AUTO: ('V4L2_CID_FOCUS_AUTO', 'Enables continuous automatic focus adjustments. The effect of manual focus adjustments while this feature is enabled is undefined, drivers should ignore such requests.'),
-    V4L2_CID_ZOOM_ABSOLUTE: ('V4L2_CID_ZOOM_ABSOLUTE', 'Specify the objective lens focal length as an absolute value. The zoom unit is driver-specific and its value should be a positive integer.'),
-    V4L2_CID_ZOOM_RELATIVE: ('V4L2_CID_ZOOM_RELATIVE', 'Specify the objective lens focal length relatively to the current value. Positive values move the zoom lens group towards the telephoto direction, negative values towards the wide-angle direction. The zoom unit is driver-specific. This is a write-only control.'),
-    V4L2_CID_ZOOM_CONTINUOUS: ('V4L2_CID_ZOOM_CONTINUOUS', 'Move the objective lens group at the specified speed until it reaches physical device limits or until an explicit request to stop the movement. A positive value moves the zoom lens group towards the telephoto direction. A value of zero stops the zoom lens group movement. A negative value moves the zoom lens group towards the wide-angle direction. The zoom speed unit is driver-specific.'),
-    V4L2_CID_PRIVACY: ('V4L2_CID_PRIVACY', 'Prevent video from being acquired by the camera. When this control is set to TRUE (1), no image can be captured by the camera. Common means to enforce privacy are mechanical obturation of the sensor and firmware image processing, but the device is not restricted to these methods. Devices that implement the privacy control must support read access and may support write access.'),
-    V4L2_CID_IRIS_ABSOLUTE: ('V4L2_CID_IRIS_ABSOLUTE', 'This control sets the camera’s aperture to the specified value. The unit is undefined. Larger values open the iris wider, smaller values close it.'),
-    V4L2_CID_IRIS_RELATIVE: ('V4L2_CID_IRIS_RELATIVE', 'This control modifies the camera’s aperture by the specified amount. The unit is undefined. Positive values open the iris one step further, negative values close it one step further. This is a write-only control.'),
-    V4L2_CID_AUTO_EXPOSURE_BIAS: ('V4L2_CID_AUTO_EXPOSURE_BIAS', 'Determines the automatic exposure compensation, it is effective only when V4L2_CID_EXPOSURE_AUTO control is set to AUTO, SHUTTER_PRIORITY or APERTURE_PRIORITY. It is expressed in terms of EV, drivers should interpret the values as 0.001 EV units, where the value 1000 stands for +1 EV. Increasing the exposure compensation value is equivalent to decreasing the exposure value (EV) and will increase the amount of light at the image sensor. The camera performs the exposure compensation by adjusting absolute exposure time and/or aperture.'),
-    V4L2_CID_AUTO_N_PRESET_WHITE_BALANCE: ('V4L2_CID_AUTO_N_PRESET_WHITE_BALANCE', 'Sets white balance to automatic, manual or a preset. The presets determine color temperature of the light as a hint to the camera for white balance adjustments resulting in most accurate color representation. The following white balance presets are listed in order of increasing color temperature.'),
-    V4L2_CID_WIDE_DYNAMIC_RANGE: ('V4L2_CID_WIDE_DYNAMIC_RANGE', 'Enables or disables the camera’s wide dynamic range feature. This feature allows to obtain clear images in situations where intensity of the illumination varies significantly throughout the scene, i.e. there are simultaneously very dark and very bright areas. It is most commonly realized in cameras by combining two subsequent frames with different exposure times.'),
-    V4L2_CID_IMAGE_STABILIZATION: ('V4L2_CID_IMAGE_STABILIZATION', 'Enables or disables image stabilization.'),
-    V4L2_CID_ISO_SENSITIVITY: ('V4L2_CID_ISO_SENSITIVITY', 'Determines ISO equivalent of an image sensor indicating the sensor’s sensitivity to light. The numbers are expressed in arithmetic scale, as per ISO 12232:2006 standard, where doubling the sensor sensitivity is represented by doubling the numerical ISO value. Applications should interpret the values as standard ISO values multiplied by 1000, e.g. control value 800 stands for ISO 0.8. Drivers will usually support only a subset of standard ISO values. The effect of setting this control while the V4L2_CID_ISO_SENSITIVITY_AUTO control is set to a value other than V4L2_CID_ISO_SENSITIVITY_MANUAL is undefined, drivers should ignore such requests.'),
-    V4L2_CID_ISO_SENSITIVITY_AUTO: ('V4L2_CID_ISO_SENSITIVITY_AUTO', 'Enables or disables automatic ISO sensitivity adjustments.'),
-    V4L2_CID_EXPOSURE_METERING: ('V4L2_CID_EXPOSURE_METERING', 'Determines how the camera measures the amount of light available for the frame exposure. Possible values are:'),
-    V4L2_CID_SCENE_MODE: ('V4L2_CID_SCENE_MODE', 'This control allows to select scene programs as the camera automatic modes optimized for common shooting scenes. Within these modes the camera determines best exposure, aperture, focusing, light metering, white balance and equivalent sensitivity. The controls of those parameters are influenced by the scene mode control. An exact behavior in each mode is subject to the camera specification. When the scene mode feature is not used, this control should be set to V4L2_SCENE_MODE_NONE to make sure the other possibly related controls are accessible.'),
-    V4L2_CID_3A_LOCK: ('V4L2_CID_3A_LOCK', 'This control locks or unlocks the automatic focus, exposure and white balance. The automatic adjustments can be paused independently by setting the corresponding lock bit to 1. The camera then retains the settings until the lock bit is cleared. The following lock bits are defined: When a given algorithm is not enabled, drivers should ignore requests to lock it and should return no error. An example might be an application setting bit V4L2_LOCK_WHITE_BALANCE when the V4L2_CID_AUTO_WHITE_BALANCE control is set to FALSE. The value of this control may be changed by exposure, white balance or focus controls'),
-    V4L2_CID_AUTO_FOCUS_START: ('V4L2_CID_AUTO_FOCUS_START', 'Starts single auto focus process. The effect of setting this control when V4L2_CID_FOCUS_AUTO is set to TRUE (1) is undefined, drivers should ignore such requests.'),
-    V4L2_CID_AUTO_FOCUS_STOP: ('V4L2_CID_AUTO_FOCUS_STOP', 'Aborts automatic focusing started with V4L2_CID_AUTO_FOCUS_START control. It is effective only when the continuous autofocus is disabled, that is when V4L2_CID_FOCUS_AUTO control is set to FALSE (0)'),
-    V4L2_CID_AUTO_FOCUS_STATUS: ('V4L2_CID_AUTO_FOCUS_STATUS', 'The automatic focus status. This is a read-only control.'),
-    V4L2_CID_AUTO_FOCUS_RANGE: ('V4L2_CID_AUTO_FOCUS_RANGE', 'Determines auto focus distance range for which lens may be adjusted.'),
-    V4L2_CID_PAN_SPEED: ('V4L2_CID_PAN_SPEED', 'This control turns the camera horizontally at the specific speed. The unit is undefined. A positive value moves the camera to the right (clockwise when viewed from above), a negative value to the left. A value of zero stops the motion if one is in progress and has no effect otherwise.'),
-    V4L2_CID_TILT_SPEED: ('V4L2_CID_TILT_SPEED', 'This control turns the camera vertically at the specified speed. The unit is undefined. A positive value moves the camera up, a negative value down. A value of zero stops the motion if one is in progress and has no effect otherwise.'),
-    V4L2_CID_CAMERA_ORIENTATION: ('V4L2_CID_CAMERA_ORIENTATION', 'his read-only control describes the camera orientation by reporting its mounting position on the device where the camera is installed. The control value is constant and not modifiable by software. This control is particularly meaningful for devices which have a well defined orientation, such as phones, laptops and portable devices since the control is expressed as a position relative to the device’s intended usage orientation. For example, a camera installed on the user-facing side of a phone, a tablet or a laptop device is said to be have V4L2_CAMERA_ORIENTATION_FRONT orientation, while a camera installed on the opposite side of the front one is said to be have V4L2_CAMERA_ORIENTATION_BACK orientation. Camera sensors not directly attached to the device, or attached in a way that allows them to move freely, such as webcams and digital cameras, are said to have the V4L2_CAMERA_ORIENTATION_EXTERNAL orientation.'),
-    V4L2_CID_CAMERA_SENSOR_ROTATION: ('V4L2_CID_CAMERA_SENSOR_ROTATION', 'This read-only control describes the rotation correction in degrees in the counter-clockwise direction to be applied to the captured images once captured to memory to compensate for the camera sensor mounting rotation.'),
-    V4L2_CID_HDR_SENSOR_MODE : ('V4L2_CID_HDR_SENSOR_MODE', 'Change the sensor HDR mode. A HDR picture is obtained by merging two captures of the same scene using two different exposure periods. HDR mode describes the way these two captures are merged in the sensor. As modes differ for each sensor, menu items are not standardized by this control and are left to the programmer.'),
-
-    V4L2_CID_JPEG_CHROMA_SUBSAMPLING: ('V4L2_CID_JPEG_CHROMA_SUBSAMPLING', 'The chroma subsampling factors describe how each component of an input image is sampled, in respect to maximum sample rate in each spatial dimension. See ITU-T.81, clause A.1.1. for more details. The V4L2_CID_JPEG_CHROMA_SUBSAMPLING control determines how Cb and Cr components are downsampled after coverting an input image from RGB to Y’CbCr color space.'),
-    V4L2_CID_JPEG_RESTART_INTERVAL: ('V4L2_CID_JPEG_RESTART_INTERVAL', 'The restart interval determines an interval of inserting RSTm markers (m = 0..7). The purpose of these markers is to additionally reinitialize the encoder process, in order to process blocks of an image independently. For the lossy compression processes the restart interval unit is MCU (Minimum Coded Unit) and its value is contained in DRI (Define Restart Interval) marker. If V4L2_CID_JPEG_RESTART_INTERVAL control is set to 0, DRI and RSTm markers will not be inserted.'),
-    V4L2_CID_JPEG_COMPRESSION_QUALITY: ('V4L2_CID_JPEG_COMPRESSION_QUALITY', 'Determines trade-off between image quality and size. It provides simpler method for applications to control image quality, without a need for direct reconfiguration of luminance and chrominance quantization tables. In cases where a driver uses quantization tables configured directly by an application, using interfaces defined elsewhere, V4L2_CID_JPEG_COMPRESSION_QUALITY control should be set by driver to 0. \nThe value range of this control is driver-specific. Only positive, non-zero values are meaningful. The recommended range is 1 - 100, where larger values correspond to better image quality.'),
-    V4L2_CID_JPEG_ACTIVE_MARKER: ('V4L2_CID_JPEG_ACTIVE_MARKER', 'Specify which JPEG markers are included in compressed stream. This control is valid only for encoders.'),
-
-    V4L2_CID_VBLANK: ('V4L2_CID_VBLANK', 'Vertical blanking. The idle period after every frame during which no image data is produced. The unit of vertical blanking is a line. Every line has length of the image width plus horizontal blanking at the pixel rate defined by V4L2_CID_PIXEL_RATE control in the same sub-device.'),
-    V4L2_CID_HBLANK: ('V4L2_CID_HBLANK', 'Horizontal blanking. The idle period after every line of image data during which no image data is produced. The unit of horizontal blanking is pixels.'),
-    V4L2_CID_ANALOGUE_GAIN: ('V4L2_CID_ANALOGUE_GAIN', 'Analogue gain is gain affecting all colour components in the pixel matrix. The gain operation is performed in the analogue domain before A/D conversion.'),
-    V4L2_CID_TEST_PATTERN_RED: ('V4L2_CID_TEST_PATTERN_RED', 'Test pattern red colour component.'),
-    V4L2_CID_TEST_PATTERN_GREENR: ('V4L2_CID_TEST_PATTERN_GREENR', 'Test pattern green (next to red) colour component.'),
-    V4L2_CID_TEST_PATTERN_BLUE: ('V4L2_CID_TEST_PATTERN_BLUE', 'Test pattern blue colour component.'),
-    V4L2_CID_TEST_PATTERN_GREENB: ('V4L2_CID_TEST_PATTERN_GREENB', 'Test pattern green (next to blue) colour component.'),
-    V4L2_CID_UNIT_CELL_SIZE: ('V4L2_CID_UNIT_CELL_SIZE', 'This control returns the unit cell size in nanometers. The struct v4l2_area provides the width and the height in separate fields to take into consideration asymmetric pixels. This control does not take into consideration any possible hardware binning. The unit cell consists of the whole area of the pixel, sensitive and non-sensitive. This control is required for automatic calibration of sensors/cameras.'),
-    V4L2_CID_NOTIFY_GAINS: ('V4L2_CID_NOTIFY_GAINS', 'The sensor is notified what gains will be applied to the different colour channels by subsequent processing (such as by an ISP). The sensor is merely informed of these values in case it performs processing that requires them, but it does not apply them itself to the output pixels.\nCurrently it is defined only for Bayer sensors, and is an array control taking 4 gain values, being the gains for each of the Bayer channels. The gains are always in the order B, Gb, Gr and R, irrespective of the exact Bayer order of the sensor itself.\nThe use of an array allows this control to be extended to sensors with, for example, non-Bayer CFAs (colour filter arrays).\nThe units for the gain values are linear, with the default value representing a gain of exactly 1.0. For example, if this default value is reported as being (say) 128, then a value of 192 would represent a gain of exactly 1.5.\n'),
-
-    V4L2_CID_LINK_FREQ: ('V4L2_CID_LINK_FREQ', 'The frequency of the data bus (e.g. parallel or CSI-2).'),
-    V4L2_CID_PIXEL_RATE: ('V4L2_CID_PIXEL_RATE', 'Pixel sampling rate in the device\'s pixel array. This control is read-only and its unit is pixels / second.\nSome devices use horizontal and vertical balanking to configure the frame rate. The frame rate can be calculated from the pixel rate, analogue crop rectangle as well as horizontal and vertical blanking. The pixel rate control may be present in a different sub-device than the blanking controls and the analogue crop rectangle configuration.\nThe configuration of the frame rate is performed by selecting the desired horizontal and vertical blanking. The unit of this control is Hz.'),
-    V4L2_CID_TEST_PATTERN: ('V4L2_CID_TEST_PATTERN', 'Some capture/display/sensor devices have the capability to generate test pattern images. These hardware specific test patterns can be used to test if a device is working properly.'),
-    V4L2_CID_DEINTERLACING_MODE: ('V4L2_CID_DEINTERLACING_MODE', 'The video deinterlacing mode (such as Bob, Weave, ...). The menu items are driver specific and are documented in Video4Linux (V4L) driver-specific documentation.'),
-    V4L2_CID_DIGITAL_GAIN: ('V4L2_CID_DIGITAL_GAIN', 'Digital gain is the value by which all colour components are multiplied by. Typically the digital gain applied is the control value divided by e.g. 0x100, meaning that to get no digital gain the control value needs to be 0x100. The no-gain configuration is also typically the default.'),
-}
+# the descriptions are only needed for the tooltips, build the map on the first use
+@functools.lru_cache(maxsize=None)
+def get_v4l2_ctrl_info():
+    return {
+        V4L2_CID_BRIGHTNESS: ('V4L2_CID_BRIGHTNESS', 'Picture brightness, or more precisely, the black level.'),
+        V4L2_CID_CONTRAST: ('V4L2_CID_CONTRAST', 'Picture contrast or luma gain.'),
+        V4L2_CID_SATURATION: ('V4L2_CID_SATURATION', 'Picture color saturation or chroma gain.'),
+        V4L2_CID_HUE: ('V4L2_CID_HUE', 'Hue or color balance.'),
+        V4L2_CID_AUTO_WHITE_BALANCE: ('V4L2_CID_AUTO_WHITE_BALANCE', 'Automatic white balance.'),
+        V4L2_CID_DO_WHITE_BALANCE: ('V4L2_CID_DO_WHITE_BALANCE', 'This is an action control. When set (the value is ignored), the device will do a white balance and then hold the current setting. Contrast this with the boolean V4L2_CID_AUTO_WHITE_BALANCE, which, when activated, keeps adjusting the white balance.'),
+        V4L2_CID_RED_BALANCE: ('V4L2_CID_RED_BALANCE', 'Red chroma balance.'),
+        V4L2_CID_BLUE_BALANCE: ('V4L2_CID_BLUE_BALANCE', 'Blue chroma balance.'),
+        V4L2_CID_GAMMA: ('V4L2_CID_GAMMA', 'Gamma adjust.'),
+        V4L2_CID_EXPOSURE: ('V4L2_CID_EXPOSURE', 'Exposure.'),
+        V4L2_CID_AUTOGAIN: ('V4L2_CID_AUTOGAIN', 'Automatic gain/exposure control.'),
+        V4L2_CID_GAIN: ('V4L2_CID_GAIN', 'Gain control.'),
+        V4L2_CID_HFLIP: ('V4L2_CID_HFLIP', 'Mirror the picture horizontally.'),
+        V4L2_CID_VFLIP: ('V4L2_CID_VFLIP', 'Mirror the picture vertically.'),
+        V4L2_CID_POWER_LINE_FREQUENCY: ('V4L2_CID_POWER_LINE_FREQUENCY', 'Enables a power line frequency filter to avoid flicker.'),
+        V4L2_CID_HUE_AUTO: ('V4L2_CID_HUE_AUTO', 'Enables automatic hue control by the device. The effect of setting V4L2_CID_HUE while automatic hue control is enabled is undefined, drivers should ignore such request.'),
+        V4L2_CID_WHITE_BALANCE_TEMPERATURE: ('V4L2_CID_WHITE_BALANCE_TEMPERATURE', 'This control specifies the white balance settings as a color temperature in Kelvin. A driver should have a minimum of 2800 (incandescent) to 6500 (daylight).'),
+        V4L2_CID_SHARPNESS: ('V4L2_CID_SHARPNESS', 'Adjusts the sharpness filters in a camera. The minimum value disables the filters, higher values give a sharper picture.'),
+        V4L2_CID_BACKLIGHT_COMPENSATION: ('V4L2_CID_BACKLIGHT_COMPENSATION', 'Adjusts the backlight compensation in a camera. The minimum value disables backlight compensation.'),
+        V4L2_CID_CHROMA_AGC: ('V4L2_CID_CHROMA_AGC', 'Chroma automatic gain control.'),
+        V4L2_CID_CHROMA_GAIN: ('V4L2_CID_CHROMA_GAIN', 'Adjusts the Chroma gain control (for use when chroma AGC is disabled).'),
+        V4L2_CID_COLOR_KILLER: ('V4L2_CID_COLOR_KILLER', 'Enable the color killer (i. e. force a black & white image in case of a weak video signal).'),
+        V4L2_CID_COLORFX: ('V4L2_CID_COLORFX', 'Selects a color effect.'),
+        V4L2_CID_AUTOBRIGHTNESS: ('V4L2_CID_AUTOBRIGHTNESS', 'Enable Automatic Brightness.'),
+        V4L2_CID_BAND_STOP_FILTER: ('V4L2_CID_BAND_STOP_FILTER', 'Switch the band-stop filter of a camera sensor on or off, or specify its strength. Such band-stop filters can be used, for example, to filter out the fluorescent light component.'),
+        V4L2_CID_ROTATE: ('V4L2_CID_ROTATE', 'Rotates the image by specified angle. Common angles are 90, 270 and 180. Rotating the image to 90 and 270 will reverse the height and width of the display window. It is necessary to set the new height and width of the picture using the VIDIOC_S_FMT ioctl according to the rotation angle selected'),
+        V4L2_CID_BG_COLOR: ('V4L2_CID_BG_COLOR', 'Sets the background color on the current output device. Background color needs to be specified in the RGB24 format. The supplied 32 bit value is interpreted as bits 0-7 Red color information, bits 8-15 Green color information, bits 16-23 Blue color information and bits 24-31 must be zero.'),
+        V4L2_CID_ILLUMINATORS_1: ('V4L2_CID_ILLUMINATORS_1', 'Switch on or off the illuminator 1 of the device (usually a microscope).'),
+        V4L2_CID_ILLUMINATORS_2: ('V4L2_CID_ILLUMINATORS_2', 'Switch on or off the illuminator 2 of the device (usually a microscope).'),
+        V4L2_CID_ALPHA_COMPONENT: ('V4L2_CID_ALPHA_COMPONENT', 'Sets the alpha color component. When a capture device (or capture queue of a mem-to-mem device) produces a frame format that includes an alpha component (e.g. packed RGB image formats) and the alpha value is not defined by the device or the mem-to-mem input data this control lets you select the alpha component value of all pixels. When an output device (or output queue of a mem-to-mem device) consumes a frame format that doesn’t include an alpha component and the device supports alpha channel processing this control lets you set the alpha component value of all pixels for further processing in the device.'),
+        V4L2_CID_COLORFX_CBCR: ('V4L2_CID_COLORFX_CBCR', 'Determines the Cb and Cr coefficients for V4L2_COLORFX_SET_CBCR color effect. Bits [7:0] of the supplied 32 bit value are interpreted as Cr component, bits [15:8] as Cb component and bits [31:16] must be zero.'),
+        V4L2_CID_COLORFX_RGB: ('V4L2_CID_COLORFX_RGB', 'Determines the Red, Green, and Blue coefficients for V4L2_COLORFX_SET_RGB color effect. Bits [7:0] of the supplied 32 bit value are interpreted as Blue component, bits [15:8] as Green component, bits [23:16] as Red component, and bits [31:24] must be zero.'),
+
+        V4L2_CID_EXPOSURE_AUTO: ('V4L2_CID_EXPOSURE_AUTO', 'Enables automatic adjustments of the exposure time and/or iris aperture. The effect of manual changes of the exposure time or iris aperture while these features are enabled is undefined, drivers should ignore such requests. Possible values are: AUTO: Automatic exposure time, automatic iris aperture. MANUAL: Manual exposure time, manual iris. SHUTTER_PRIORITY: Manual exposure time, auto iris. APERTURE_PRIORITY: Auto exposure time, manual iris.'),
+        V4L2_CID_EXPOSURE_ABSOLUTE: ('V4L2_CID_EXPOSURE_ABSOLUTE', 'Determines the exposure time of the camera sensor. The exposure time is limited by the frame interval. Drivers should interpret the values as 100 µs units, where the value 1 stands for 1/10000th of a second, 10000 for 1 second and 100000 for 10 seconds.'),
+        V4L2_CID_EXPOSURE_AUTO_PRIORITY: ('V4L2_CID_EXPOSURE_AUTO_PRIORITY', 'When V4L2_CID_EXPOSURE_AUTO is set to AUTO or APERTURE_PRIORITY, this control determines if the device may dynamically vary the frame rate. By default this feature is disabled (0) and the frame rate must remain constant.'),
+        V4L2_CID_PAN_RELATIVE: ('V4L2_CID_PAN_RELATIVE', 'This control turns the camera horizontally by the specified amount. The unit is undefined. A positive value moves the camera to the right (clockwise when viewed from above), a negative value to the left. A value of zero does not cause motion. This is a write-only control.'),
+        V4L2_CID_TILT_RELATIVE: ('V4L2_CID_TILT_RELATIVE', 'This control turns the camera vertically by the specified amount. The unit is undefined. A positive value moves the camera up, a negative value down. A value of zero does not cause motion. This is a write-only control.'),
+        V4L2_CID_PAN_RESET: ('V4L2_CID_PAN_RESET', 'When this control is set, the camera moves horizontally to the default position.'),
+        V4L2_CID_TILT_RESET: ('V4L2_CID_TILT_RESET', 'When this control is set, the camera moves vertically to the default position.'),
+        V4L2_CID_PAN_ABSOLUTE: ('V4L2_CID_PAN_ABSOLUTE', 'This control turns the camera horizontally to the specified position. Positive values move the camera to the right (clockwise when viewed from above), negative values to the left. Drivers should interpret the values as arc seconds, with valid values between -180 * 3600 and +180 * 3600 inclusive.'),
+        V4L2_CID_TILT_ABSOLUTE: ('V4L2_CID_TILT_ABSOLUTE', 'This control turns the camera vertically to the specified position. Positive values move the camera up, negative values down. Drivers should interpret the values as arc seconds, with valid values between -180 * 3600 and +180 * 3600 inclusive.'),
+        V4L2_CID_FOCUS_ABSOLUTE: ('V4L2_CID_FOCUS_ABSOLUTE', 'This control sets the focal point of the camera to the specified position. The unit is undefined. Positive values set the focus closer to the camera, negative values towards infinity.'),
+        V4L2_CID_FOCUS_RELATIVE: ('V4L2_CID_FOCUS_RELATIVE', 'This control moves the focal point of the camera by the specified amount. The unit is undefined. Positive values move the focus closer to the camera, negative values towards infinity. This is a write-only control.'),
+        V4L2_CID_FOCUS_AUTO: ('V4L2_CID_FOCUS_AUTO', 'Enables continuous automatic focus adjustments. The effect of manual focus adjustments while this feature is enabled is undefined, drivers should ignore such requests.'),
+        V4L2_CID_ZOOM_ABSOLUTE: ('V4L2_CID_ZOOM_ABSOLUTE', 'Specify the objective lens focal length as an absolute value. The zoom unit is driver-specific and its value should be a positive integer.'),
+        V4L2_CID_ZOOM_RELATIVE: ('V4L2_CID_ZOOM_RELATIVE', 'Specify the objective lens focal length relatively to the current value. Positive values move the zoom lens group towards the telephoto direction, negative values towards the wide-angle direction. The zoom unit is driver-specific. This is a write-only control.'),
+        V4L2_CID_ZOOM_CONTINUOUS: ('V4L2_CID_ZOOM_CONTINUOUS', 'Move the objective lens group at the specified speed until it reaches physical device limits or until an explicit request to stop the movement. A positive value moves the zoom lens group towards the telephoto direction. A value of zero stops the zoom lens group movement. A negative value moves the zoom lens group towards the wide-angle direction. The zoom speed unit is driver-specific.'),
+        V4L2_CID_PRIVACY: ('V4L2_CID_PRIVACY', 'Prevent video from being acquired by the camera. When this control is set to TRUE (1), no image can be captured by the camera. Common means to enforce privacy are mechanical obturation of the sensor and firmware image processing, but the device is not restricted to these methods. Devices that implement the privacy control must support read access and may support write access.'),
+        V4L2_CID_IRIS_ABSOLUTE: ('V4L2_CID_IRIS_ABSOLUTE', 'This control sets the camera’s aperture to the specified value. The unit is undefined. Larger values open the iris wider, smaller values close it.'),
+        V4L2_CID_IRIS_RELATIVE: ('V4L2_CID_IRIS_RELATIVE', 'This control modifies the camera’s aperture by the specified amount. The unit is undefined. Positive values open the iris one step further, negative values close it one step further. This is a write-only control.'),
+        V4L2_CID_AUTO_EXPOSURE_BIAS: ('V4L2_CID_AUTO_EXPOSURE_BIAS', 'Determines the automatic exposure compensation, it is effective only when V4L2_CID_EXPOSURE_AUTO control is set to AUTO, SHUTTER_PRIORITY or APERTURE_PRIORITY. It is expressed in terms of EV, drivers should interpret the values as 0.001 EV units, where the value 1000 stands for +1 EV. Increasing the exposure compensation value is equivalent to decreasing the exposure value (EV) and will increase the amount of light at the image sensor. The camera performs the exposure compensation by adjusting absolute exposure time and/or aperture.'),
+        V4L2_CID_AUTO_N_PRESET_WHITE_BALANCE: ('V4L2_CID_AUTO_N_PRESET_WHITE_BALANCE', 'Sets white balance to automatic, manual or a preset. The presets determine color temperature of the light as a hint to the camera for white balance adjustments resulting in most accurate color representation. The following white balance presets are listed in order of increasing color temperature.'),
+        V4L2_CID_WIDE_DYNAMIC_RANGE: ('V4L2_CID_WIDE_DYNAMIC_RANGE', 'Enables or disables the camera’s wide dynamic range feature. This feature allows to obtain clear images in situations where intensity of the illumination varies significantly throughout the scene, i.e. there are simultaneously very dark and very bright areas. It is most commonly realized in cameras by combining two subsequent frames with different exposure times.'),
+        V4L2_CID_IMAGE_STABILIZATION: ('V4L2_CID_IMAGE_STABILIZATION', 'Enables or disables image stabilization.'),
+        V4L2_CID_ISO_SENSITIVITY: ('V4L2_CID_ISO_SENSITIVITY', 'Determines ISO equivalent of an image sensor indicating the sensor’s sensitivity to light. The numbers are expressed in arithmetic scale, as per ISO 12232:2006 standard, where doubling the sensor sensitivity is represented by doubling the numerical ISO value. Applications should interpret the values as standard ISO values multiplied by 1000, e.g. control value 800 stands for ISO 0.8. Drivers will usually support only a subset of standard ISO values. The effect of setting this control while the V4L2_CID_ISO_SENSITIVITY_AUTO control is set to a value other than V4L2_CID_ISO_SENSITIVITY_MANUAL is undefined, drivers should ignore such requests.'),
+        V4L2_CID_ISO_SENSITIVITY_AUTO: ('V4L2_CID_ISO_SENSITIVITY_AUTO', 'Enables or disables automatic ISO sensitivity adjustments.'),
+        V4L2_CID_EXPOSURE_METERING: ('V4L2_CID_EXPOSURE_METERING', 'Determines how the camera measures the amount of light available for the frame exposure. Possible values are:'),
+        V4L2_CID_SCENE_MODE: ('V4L2_CID_SCENE_MODE', 'This control allows to select scene programs as the camera automatic modes optimized for common shooting scenes. Within these modes the camera determines best exposure, aperture, focusing, light metering, white balance and equivalent sensitivity. The controls of those parameters are influenced by the scene mode control. An exact behavior in each mode is subject to the camera specification. When the scene mode feature is not used, this control should be set to V4L2_SCENE_MODE_NONE to make sure the other possibly related controls are accessible.'),
+        V4L2_CID_3A_LOCK: ('V4L2_CID_3A_LOCK', 'This control locks or unlocks the automatic focus, exposure and white balance. The automatic adjustments can be paused independently by setting the corresponding lock bit to 1. The camera then retains the settings until the lock bit is cleared. The following lock bits are defined: When a given algorithm is not enabled, drivers should ignore requests to lock it and should return no error. An example might be an application setting bit V4L2_LOCK_WHITE_BALANCE when the V4L2_CID_AUTO_WHITE_BALANCE control is set to FALSE. The value of this control may be changed by exposure, white balance or focus controls'),
+        V4L2_CID_AUTO_FOCUS_START: ('V4L2_CID_AUTO_FOCUS_START', 'Starts single auto focus process. The effect of setting this control when V4L2_CID_FOCUS_AUTO is set to TRUE (1) is undefined, drivers should ignore such requests.'),
+        V4L2_CID_AUTO_FOCUS_STOP: ('V4L2_CID_AUTO_FOCUS_STOP', 'Aborts automatic focusing started with V4L2_CID_AUTO_FOCUS_START control. It is effective only when the continuous autofocus is disabled, that is when V4L2_CID_FOCUS_AUTO control is set to FALSE (0)'),
+        V4L2_CID_AUTO_FOCUS_STATUS: ('V4L2_CID_AUTO_FOCUS_STATUS', 'The automatic focus status. This is a read-only control.'),
+        V4L2_CID_AUTO_FOCUS_RANGE: ('V4L2_CID_AUTO_FOCUS_RANGE', 'Determines auto focus distance range for which lens may be adjusted.'),
+        V4L2_CID_PAN_SPEED: ('V4L2_CID_PAN_SPEED', 'This control turns the camera horizontally at the specific speed. The unit is undefined. A positive value moves the camera to the right (clockwise when viewed from above), a negative value to the left. A value of zero stops the motion if one is in progress and has no effect otherwise.'),
+        V4L2_CID_TILT_SPEED: ('V4L2_CID_TILT_SPEED', 'This control turns the camera vertically at the specified speed. The unit is undefined. A positive value moves the camera up, a negative value down. A value of zero stops the motion if one is in progress and has no effect otherwise.'),
+        V4L2_CID_CAMERA_ORIENTATION: ('V4L2_CID_CAMERA_ORIENTATION', 'his read-only control describes the camera orientation by reporting its mounting position on the device where the camera is installed. The control value is constant and not modifiable by software. This control is particularly meaningful for devices which have a well defined orientation, such as phones, laptops and portable devices since the control is expressed as a position relative to the device’s intended usage orientation. For example, a camera installed on the user-facing side of a phone, a tablet or a laptop device is said to be have V4L2_CAMERA_ORIENTATION_FRONT orientation, while a camera installed on the opposite side of the front one is said to be have V4L2_CAMERA_ORIENTATION_BACK orientation. Camera sensors not directly attached to the device, or attached in a way that allows them to move freely, such as webcams and digital cameras, are said to have the V4L2_CAMERA_ORIENTATION_EXTERNAL orientation.'),
+        V4L2_CID_CAMERA_SENSOR_ROTATION: ('V4L2_CID_CAMERA_SENSOR_ROTATION', 'This read-only control describes the rotation correction in degrees in the counter-clockwise direction to be applied to the captured images once captured to memory to compensate for the camera sensor mounting rotation.'),
+        V4L2_CID_HDR_SENSOR_MODE : ('V4L2_CID_HDR_SENSOR_MODE', 'Change the sensor HDR mode. A HDR picture is obtained by merging two captures of the same scene using two different exposure periods. HDR mode describes the way these two captures are merged in the sensor. As modes differ for each sensor, menu items are not standardized by this control and are left to the programmer.'),
+
+        V4L2_CID_JPEG_CHROMA_SUBSAMPLING: ('V4L2_CID_JPEG_CHROMA_SUBSAMPLING', 'The chroma subsampling factors describe how each component of an input image is sampled, in respect to maximum sample rate in each spatial dimension. See ITU-T.81, clause A.1.1. for more details. The V4L2_CID_JPEG_CHROMA_SUBSAMPLING control determines how Cb and Cr components are downsampled after coverting an input image from RGB to Y’CbCr color space.'),
+        V4L2_CID_JPEG_RESTART_INTERVAL: ('V4L2_CID_JPEG_RESTART_INTERVAL', 'The restart interval determines an interval of inserting RSTm markers (m = 0..7). The purpose of these markers is to additionally reinitialize the encoder process, in order to process blocks of an image independently. For the lossy compression processes the restart interval unit is MCU (Minimum Coded Unit) and its value is contained in DRI (Define Restart Interval) marker. If V4L2_CID_JPEG_RESTART_INTERVAL control is set to 0, DRI and RSTm markers will not be inserted.'),
+        V4L2_CID_JPEG_COMPRESSION_QUALITY: ('V4L2_CID_JPEG_COMPRESSION_QUALITY', 'Determines trade-off between image quality and size. It provides simpler method for applications to control image quality, without a need for direct reconfiguration of luminance and chrominance quantization tables. In cases where a driver uses quantization tables configured directly by an application, using interfaces defined elsewhere, V4L2_CID_JPEG_COMPRESSION_QUALITY control should be set by driver to 0. \nThe value range of this control is driver-specific. Only positive, non-zero values are meaningful. The recommended range is 1 - 100, where larger values correspond to better image quality.'),
+        V4L2_CID_JPEG_ACTIVE_MARKER: ('V4L2_CID_JPEG_ACTIVE_MARKER', 'Specify which JPEG markers are included in compressed stream. This control is valid only for encoders.'),
+
+        V4L2_CID_VBLANK: ('V4L2_CID_VBLANK', 'Vertical blanking. The idle period after every frame during which no image data is produced. The unit of vertical blanking is a line. Every line has length of the image width plus horizontal blanking at the pixel rate defined by V4L2_CID_PIXEL_RATE control in the same sub-device.'),
+        V4L2_CID_HBLANK: ('V4L2_CID_HBLANK', 'Horizontal blanking. The idle period after every line of image data during which no image data is produced. The unit of horizontal blanking is pixels.'),
+        V4L2_CID_ANALOGUE_GAIN: ('V4L2_CID_ANALOGUE_GAIN', 'Analogue gain is gain affecting all colour components in the pixel matrix. The gain operation is performed in the analogue domain before A/D conversion.'),
+        V4L2_CID_TEST_PATTERN_RED: ('V4L2_CID_TEST_PATTERN_RED', 'Test pattern red colour component.'),
+        V4L2_CID_TEST_PATTERN_GREENR: ('V4L2_CID_TEST_PATTERN_GREENR', 'Test pattern green (next to red) colour component.'),
+        V4L2_CID_TEST_PATTERN_BLUE: ('V4L2_CID_TEST_PATTERN_BLUE', 'Test pattern blue colour component.'),
+        V4L2_CID_TEST_PATTERN_GREENB: ('V4L2_CID_TEST_PATTERN_GREENB', 'Test pattern green (next to blue) colour component.'),
+        V4L2_CID_UNIT_CELL_SIZE: ('V4L2_CID_UNIT_CELL_SIZE', 'This control returns the unit cell size in nanometers. The struct v4l2_area provides the width and the height in separate fields to take into consideration asymmetric pixels. This control does not take into consideration any possible hardware binning. The unit cell consists of the whole area of the pixel, sensitive and non-sensitive. This control is required for automatic calibration of sensors/cameras.'),
+        V4L2_CID_NOTIFY_GAINS: ('V4L2_CID_NOTIFY_GAINS', 'The sensor is notified what gains will be applied to the different colour channels by subsequent processing (such as by an ISP). The sensor is merely informed of these values in case it performs processing that requires them, but it does not apply them itself to the output pixels.\nCurrently it is defined only for Bayer sensors, and is an array control taking 4 gain values, being the gains for each of the Bayer channels. The gains are always in the order B, Gb, Gr and R, irrespective of the exact Bayer order of the sensor itself.\nThe use of an array allows this control to be extended to sensors with, for example, non-Bayer CFAs (colour filter arrays).\nThe units for the gain values are linear, with the default value representing a gain of exactly 1.0. For example, if this default value is reported as being (say) 128, then a value of 192 would represent a gain of exactly 1.5.\n'),
+
+        V4L2_CID_LINK_FREQ: ('V4L2_CID_LINK_FREQ', 'The frequency of the data bus (e.g. parallel or CSI-2).'),
+        V4L2_CID_PIXEL_RATE: ('V4L2_CID_PIXEL_RATE', 'Pixel sampling rate in the device\'s pixel array. This control is read-only and its unit is pixels / second.\nSome devices use horizontal and vertical balanking to configure the frame rate. The frame rate can be calculated from the pixel rate, analogue crop rectangle as well as horizontal and vertical blanking. The pixel rate control may be present in a different sub-device than the blanking controls and the analogue crop rectangle configuration.\nThe configuration of the frame rate is performed by selecting the desired horizontal and vertical blanking. The unit of this control is Hz.'),
+        V4L2_CID_TEST_PATTERN: ('V4L2_CID_TEST_PATTERN', 'Some capture/display/sensor devices have the capability to generate test pattern images. These hardware specific test patterns can be used to test if a device is working properly.'),
+        V4L2_CID_DEINTERLACING_MODE: ('V4L2_CID_DEINTERLACING_MODE', 'The video deinterlacing mode (such as Bob, Weave, ...). The menu items are driver specific and are documented in Video4Linux (V4L) driver-specific documentation.'),
+        V4L2_CID_DIGITAL_GAIN: ('V4L2_CID_DIGITAL_GAIN', 'Digital gain is the value by which all colour components are multiplied by. Typically the digital gain applied is the control value divided by e.g. 0x100, meaning that to get no digital gain the control value needs to be 0x100. The no-gain configuration is also typically the default.'),
+    }
+
+# keep V4L2_CTRL_INFO importable for external users, it is built on the first access
+def __getattr__(name):
+    if name == 'V4L2_CTRL_INFO':
+        return get_v4l2_ctrl_info()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 class v4l2_control(ctypes.Structure):
     _fields_ = [
@@ -833,6 +966,36 @@ class v4l2_querymenu(ctypes.Structure):
     _anonymous_ = ('_u',)
     _pack_ = True
 
+V4L2_CTRL_WHICH_CUR_VAL = 0
+
+class v4l2_ext_control(ctypes.Structure):
+    class _u(ctypes.Union):
+        _fields_ = [
+            ('value', ctypes.c_int32),
+            ('value64', ctypes.c_int64),
+            ('ptr', ctypes.c_void_p),
+        ]
+        _pack_ = True
+
+    _fields_ = [
+        ('id', ctypes.c_uint32),
+        ('size', ctypes.c_uint32),
+        ('reserved2', ctypes.c_uint32 * 1),
+        ('_u', _u),
+    ]
+    _anonymous_ = ('_u',)
+    _pack_ = True
+
+class v4l2_ext_controls(ctypes.Structure):
+    _fields_ = [
+        ('which', ctypes.c_uint32),
+        ('count', ctypes.c_uint32),
+        ('error_idx', ctypes.c_uint32),
+        ('request_fd', ctypes.c_int32),
+        ('reserved', ctypes.c_uint32 * 1),
+        ('controls', ctypes.POINTER(v4l2_ext_control)),
+    ]
+
 class uvc_xu_control_query(ctypes.Structure):
     _fields_ = [
         ('unit', ctypes.c_uint8),
@@ -902,12 +1065,17 @@ class v4l2_event(ctypes.Structure):
     ]
     _anonymous_ = ('_u',)
 
+# the ctrl event fields can be read with struct.unpack_from, without the _anonymous_ descriptors
+V4L2_EVENT_CTRL_VALUE_OFFSET = v4l2_event._u.offset + v4l2_event_ctrl._u.offset
+V4L2_EVENT_CTRL_FLAGS_OFFSET = v4l2_event._u.offset + v4l2_event_ctrl.flags.offset
+
 VIDIOC_QUERYCAP = _IOR('V', 0, v4l2_capability)
 UVCIOC_CTRL_QUERY = _IOWR('u', 0x21, uvc_xu_control_query)
 VIDIOC_G_CTRL = _IOWR('V', 27, v4l2_control)
 VIDIOC_S_CTRL = _IOWR('V', 28, v4l2_control)
 VIDIOC_QUERYCTRL = _IOWR('V', 36, v4l2_queryctrl)
 VIDIOC_QUERYMENU = _IOWR('V', 37, v4l2_querymenu)
+VIDIOC_G_EXT_CTRLS = _IOWR('V', 71, v4l2_ext_controls)
 VIDIOC_DQEVENT = _IOR('V', 89, v4l2_event)
 VIDIOC_SUBSCRIBE_EVENT = _IOW('V', 90, v4l2_event_subscription)
 VIDIOC_UNSUBSCRIBE_EVENT = _IOW('V', 91, v4l2_event_subscription)
@@ -923,6 +1091,13 @@ UVC_GET_LEN      = 0x85
 UVC_GET_INFO     = 0x86
 UVC_GET_DEF      = 0x87
 
+USB_DT_INTERFACE = 0x04
+USB_DT_CS_INTERFACE = 0x24
+USB_CLASS_VIDEO = 0x0e
+USB_CLASS_VENDOR_SPEC = 0xff
+UVC_SC_VIDEOCONTROL = 0x01
+UVC_VC_EXTENSION_UNIT = 0x06
+
 EU1_SET_ISP = 0x01
 EU1_GET_ISP_RESULT = 0x02
 
@@ -958,89 +1133,130 @@ LOAD =          b'\x00\x00\x00\x00\x00\x00\x00\x00'
 def to_buf(b):
     return ctypes.create_string_buffer(b)
 
-def try_xu_control(fd, unit_id, selector):
-    length = ctypes.c_uint16(0)
+# for the commands which are sent right away, the result is overwritten by the next call
+xu_scratch_buf = ctypes.create_string_buffer(64)
+
+def to_scratch_buf(b):
+    if len(b) > len(xu_scratch_buf):
+        return to_buf(b)
+    ctypes.memset(xu_scratch_buf, 0, len(xu_scratch_buf))
+    ctypes.memmove(xu_scratch_buf, b, len(b))
+    return xu_scratch_buf
+
+# the xu queries are only issued from one thread, reuse the query and the length buffer
+xu_ctrl_query = uvc_xu_control_query()
+xu_ctrl_length = ctypes.c_uint16(0)
+
+# the length of a control doesn't change while the device is open, CameraCtrls clears it on open
+xu_ctrl_lengths = {}
 
-    xu_ctrl_query = uvc_xu_control_query()
+def xu_control_query(fd, unit_id, selector, query, size, data):
     xu_ctrl_query.unit = unit_id
     xu_ctrl_query.selector = selector
-    xu_ctrl_query.query = UVC_GET_LEN
-    xu_ctrl_query.size = 2 # sizeof(length)
-    xu_ctrl_query.data = ctypes.cast(ctypes.pointer(length), ctypes.c_void_p)
+    xu_ctrl_query.query = query
+    xu_ctrl_query.size = size
+    xu_ctrl_query.data = ctypes.addressof(data)
+    ioctl(fd, UVCIOC_CTRL_QUERY, xu_ctrl_query)
 
+def try_xu_control(fd, unit_id, selector):
     try:
-       ioctl(fd, UVCIOC_CTRL_QUERY, xu_ctrl_query)
+        xu_control_query(fd, unit_id, selector, UVC_GET_LEN, 2, xu_ctrl_length)
     except Exception as e:
         logging.debug(f'try_xu_control: UVCIOC_CTRL_QUERY (GET_LEN) - Fd: {fd} - Error: {e}')
         return False
 
+    # the later queries of this control won't need the GET_LEN
+    xu_ctrl_lengths[(fd, unit_id, selector)] = xu_ctrl_length.value
     return True
 
-def get_length_xu_control(fd, unit_id, selector):
-    length = ctypes.c_uint16(0)
+# returns the supported ones of the selectors, a selector is probed only once
+def probe_xu_selectors(fd, unit_id, selectors):
+    return frozenset(s for s in set(selectors) if try_xu_control(fd, unit_id, s))
 
-    xu_ctrl_query = uvc_xu_control_query()
-    xu_ctrl_query.unit = unit_id
-    xu_ctrl_query.selector = selector
-    xu_ctrl_query.query = UVC_GET_LEN
-    xu_ctrl_query.size = 2 # sizeof(length)
-    xu_ctrl_query.data = ctypes.cast(ctypes.pointer(length), ctypes.c_void_p)
+def get_length_xu_control(fd, unit_id, selector):
+    length = xu_ctrl_lengths.get((fd, unit_id, selector))
+    if length is not None:
+        return length
 
+    xu_ctrl_length.value = 0
     try:
-       ioctl(fd, UVCIOC_CTRL_QUERY, xu_ctrl_query)
+        xu_control_query(fd, unit_id, selector, UVC_GET_LEN, 2, xu_ctrl_length)
     except Exception as e:
         logging.warning(f'UVCIOC_CTRL_QUERY (GET_LEN) - Fd: {fd} - Error: {e}')
+        return 0
 
+    length = xu_ctrl_length.value
+    xu_ctrl_lengths[(fd, unit_id, selector)] = length
     return length
 
 def query_xu_control(fd, unit_id, selector, query, data):
     len = get_length_xu_control(fd, unit_id, selector)
 
-    xu_ctrl_query = uvc_xu_control_query()
-    xu_ctrl_query.unit = unit_id
-    xu_ctrl_query.selector = selector
-    xu_ctrl_query.query = query
-    xu_ctrl_query.size = len
-    xu_ctrl_query.data = ctypes.cast(ctypes.pointer(data), ctypes.c_void_p)
-
     try:
-        ioctl(fd, UVCIOC_CTRL_QUERY, xu_ctrl_query)
+        xu_control_query(fd, unit_id, selector, query, len, data)
     except Exception as e:
         logging.warning(f'UVCIOC_CTRL_QUERY (0x{query:02x}) - Fd: {fd} - Error: {e}')
 
+# the vendor ctrls of a device read the same sysfs files, they are cached until clear_sysfs_cache()
+def clear_sysfs_cache():
+    find_xu_units_in_file.cache_clear()
+    find_usb_ids_in_sysfs.cache_clear()
+
 # the usb device descriptors file contains the descriptors in a binary format
-# the byte before the extension guid is the extension unit id
-def find_unit_id_in_sysfs(device, guid):
+# walk them once and collect the extension units of the video control interfaces
+@functools.lru_cache(maxsize=64)
+def find_xu_units_in_file(file):
+    units = {}
+    try:
+        with open(file, 'rb') as f:
+            descriptors = memoryview(f.read())
+    except FileNotFoundError:
+        return units
+    except Exception as e:
+        logging.warning(f'Failed to read uvc xu unit id from {file}: {e}')
+        return units
+
+    in_vc = False
+    pos = 0
+    while pos + 2 <= len(descriptors):
+        length = descriptors[pos]
+        if length < 2:
+            break
+        d = descriptors[pos:pos + length]
+        if d[1] == USB_DT_INTERFACE and length >= 7:
+            # some cameras have a vendor class video control interface, uvcvideo binds them by quirks
+            in_vc = d[5] in (USB_CLASS_VIDEO, USB_CLASS_VENDOR_SPEC) and d[6] == UVC_SC_VIDEOCONTROL
+        elif in_vc and d[1] == USB_DT_CS_INTERFACE and length >= 20 and d[2] == UVC_VC_EXTENSION_UNIT:
+            # bUnitID is followed by guidExtensionCode
+            units.setdefault(d[4:20].tobytes(), d[3])
+        pos += length
+
+    return units
+
+def find_xu_units_in_sysfs(device):
     if os.path.islink(device):
         device = os.readlink(device)
     device = os.path.basename(device)
     descfile = f'/sys/class/video4linux/{device}/../../../descriptors'
-    if not os.path.isfile(descfile):
-        return 0
-
-    try:
-        with open(descfile, 'rb') as f:
-            descriptors = f.read()
-            guid_start = descriptors.find(guid)
-            if guid_start > 0:
-                return descriptors[guid_start - 1]
-    except Exception as e:
-        logging.warning(f'Failed to read uvc xu unit id from {descfile}: {e}')
+    return find_xu_units_in_file(descfile)
 
-    return 0
+def find_unit_id_in_sysfs(device, guid):
+    return find_xu_units_in_sysfs(device).get(guid, 0)
 
+@functools.lru_cache(maxsize=64)
 def find_usb_ids_in_sysfs(device):
     if os.path.islink(device):
         device = os.readlink(device)
     device = os.path.basename(device)
     vendorfile = f'/sys/class/video4linux/{device}/../../../idVendor'
     productfile = f'/sys/class/video4linux/{device}/../../../idProduct'
-    if not os.path.isfile(vendorfile) or not os.path.isfile(productfile):
+    # not an usb device
+    try:
+        vendor = read_usb_id_from_file(vendorfile)
+        product = read_usb_id_from_file(productfile)
+    except FileNotFoundError:
         return ''
 
-    vendor = read_usb_id_from_file(vendorfile)
-    product = read_usb_id_from_file(productfile)
-
     return vendor + ':' + product
 
 def read_usb_id_from_file(file):
@@ -1048,18 +1264,30 @@ def read_usb_id_from_file(file):
     try:
         with open(file, 'r') as f:
             id = f.read().strip()
+    except FileNotFoundError:
+        raise
     except Exception as e:
         logging.warning(f'Failed to read usb id from {file}: {e}')
     return id
 
-def get_device_capability(device):
-    cap = v4l2_capability()
+def get_device_capability(device, cap=None):
+    if cap is None:
+        cap = v4l2_capability()
+    else:
+        ctypes.memset(ctypes.addressof(cap), 0, ctypes.sizeof(cap))
+    # the querycap needs no streaming, don't wait for a busy device
+    try:
+        fd = os.open(device, os.O_RDWR | os.O_NONBLOCK, 0)
+    except Exception as e:
+        logging.error(f'get_device_capability({device}) failed: {e}')
+        return cap
+
     try:
-        fd = os.open(device, os.O_RDWR, 0)
         ioctl(fd, VIDIOC_QUERYCAP, cap)
-        os.close(fd)
     except Exception as e:
         logging.error(f'get_device_capability({device}) failed: {e}')
+    finally:
+        os.close(fd)
 
     return cap
 
@@ -1081,44 +1309,53 @@ def find_idx(ctrls, pred):
             return i
     return None
 
+# one pass over the ctrls, the result is grouped in the order of the text_ids
 def pop_list_by_text_ids(ctrls, text_ids):
-    ret = []
-    for text_id in text_ids:
-        while True:
-            idx = find_idx(ctrls, lambda c: c.text_id.startswith(text_id))
-            if idx is not None:
-                ret.append(ctrls.pop(idx))
-            else:
+    prefixes = tuple(text_ids)
+    groups = [[] for _ in prefixes]
+    rest = []
+    for c in ctrls:
+        if not c.text_id.startswith(prefixes):
+            rest.append(c)
+            continue
+        for i, prefix in enumerate(prefixes):
+            if c.text_id.startswith(prefix):
+                groups[i].append(c)
                 break
-    return ret
+    ctrls[:] = rest
+    return [c for g in groups for c in g]
 
 def pop_list_by_base_id(ctrls, base_id):
+    ctrl_class = base_id & V4L2_CTRL_CLASS_MASK
     ret = []
-    while True:
-        idx = find_idx(ctrls, lambda c: hasattr(c, 'v4l2_id') and c.v4l2_id & V4L2_CTRL_CLASS_MASK == base_id & V4L2_CTRL_CLASS_MASK)
-        if idx is not None:
-            ret.append(ctrls.pop(idx))
+    rest = []
+    for c in ctrls:
+        v4l2_id = getattr(c, 'v4l2_id', None)
+        if v4l2_id is not None and v4l2_id & V4L2_CTRL_CLASS_MASK == ctrl_class:
+            ret.append(c)
         else:
-            break
+            rest.append(c)
+    ctrls[:] = rest
     return ret
 
+# one pass over the ctrls, the result is in the order of the ids
 def pop_list_by_ids(ctrls, ids):
-    ret = []
-    for id in ids:
-        while True:
-            idx = find_idx(ctrls, lambda c: hasattr(c, 'v4l2_id') and c.v4l2_id == id)
-            if idx is not None:
-                ret.append(ctrls.pop(idx))
-            else:
-                break
-    return ret
+    groups = {id: [] for id in ids}
+    rest = []
+    for c in ctrls:
+        group = groups.get(getattr(c, 'v4l2_id', None))
+        if group is not None:
+            group.append(c)
+        else:
+            rest.append(c)
+    ctrls[:] = rest
+    return [c for g in groups.values() for c in g]
+
+TRUE_STRS = frozenset(('y', 'yes', 't', 'true', 'on', '1'))
 
 def to_bool(val):
     if type(val) == str:
-        val = val.lower()
-        if val in ('y', 'yes', 't', 'true', 'on', '1'):
-            return True
-        return False
+        return val.lower() in TRUE_STRS
     return bool(val)
 
 def collect_warning(w, ws):
@@ -1126,41 +1363,53 @@ def collect_warning(w, ws):
     ws.append(w)
     return ws
 
+# no __slots__, the GUIs attach their widgets to the ctrls and the menus
+@dataclass(eq=False)
 class BaseCtrl:
-    def __init__(self, text_id, name, type, value = None, default = None, min = None, max = None, step = None,
-                inactive = False, reopener = False, menu_dd = False, menu = None, tooltip = None, child_tooltip = None,
-                zeroer = False, scale_class = None, kernel_id = None, get_default = None, readonly = False,
-                format_value = None, step_big = None, unrestorable = False):
-        self.text_id = text_id
-        self.kernel_id = kernel_id
-        self.name = name
-        self.type = type
-        self.value = value
-        self.default = default
-        self.min = min
-        self.max = max
-        self.step = step
-        self.inactive = inactive
-        self.readonly = readonly
-        self.reopener = reopener
-        self.menu_dd = menu_dd
-        self.menu = menu
-        self.tooltip = tooltip
-        self.child_tooltip = child_tooltip
-        self.zeroer = zeroer
-        self.scale_class = scale_class
-        self.get_default = get_default
-        self.format_value = format_value
-        self.step_big = step_big
-        self.unrestorable = unrestorable
-
+    text_id: str
+    name: str
+    type: str
+    value: object = None
+    default: object = None
+    min: int = None
+    max: int = None
+    step: int = None
+    inactive: bool = False
+    reopener: bool = False
+    menu_dd: bool = False
+    menu: list = None
+    tooltip: str = None
+    child_tooltip: str = None
+    zeroer: bool = False
+    scale_class: str = None
+    kernel_id: str = None
+    get_default: object = None
+    readonly: bool = False
+    format_value: object = None
+    step_big: int = None
+    unrestorable: bool = False
+
+    def __post_init__(self):
+        # the text_ids are compared and used as keys all over, most of them are built at runtime
+        self.text_id = sys.intern(self.text_id)
+
+@dataclass(eq=False)
 class BaseCtrlMenu:
-    def __init__(self, text_id, name, value, gui_hidden=False, lp_text_id=None):
-        self.text_id = text_id
-        self.name = name
-        self.value = value
-        self.gui_hidden = gui_hidden
-        self.lp_text_id = lp_text_id
+    text_id: str
+    name: str
+    value: object
+    gui_hidden: bool = False
+    lp_text_id: str = None
+    _buf: object = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        self.text_id = sys.intern(self.text_id)
+
+    # the ctypes buffer of a bytes value for the XU queries, built on the first use
+    def get_buf(self):
+        if self._buf is None:
+            self._buf = to_buf(self.value)
+        return self._buf
 
 class KiyoCtrl(BaseCtrl):
     def __init__(self, text_id, name, type, tooltip, menu, ):
@@ -1170,6 +1419,9 @@ class KiyoMenu(BaseCtrlMenu):
     def __init__(self, text_id, name, value, before = None):
         super().__init__(text_id, name, value)
         self._before = before
+        # the commands are constant, build their buffers only once
+        self._value_buf = to_buf(value)
+        self._before_buf = to_buf(before) if before else None
 
 class KiyoProCtrls:
     def __init__(self, device, fd):
@@ -1239,13 +1491,14 @@ class KiyoProCtrls:
                 ]
             ),
         ]
+        self.ctrls_by_text_id = {c.text_id: c for c in self.ctrls}
 
     def setup_ctrls(self, params, errs):
         if not self.supported():
             return
 
         for k, v in params.items():
-            ctrl = find_by_text_id(self.ctrls, k)
+            ctrl = self.ctrls_by_text_id.get(k)
             if ctrl is None:
                 continue
             menu = find_by_text_id(ctrl.menu, v)
@@ -1254,10 +1507,10 @@ class KiyoProCtrls:
                 continue
             ctrl.value = menu.text_id
 
-            if menu._before:
-                query_xu_control(self.fd, self.unit_id, EU1_SET_ISP, UVC_SET_CUR, to_buf(menu._before))
+            if menu._before_buf is not None:
+                query_xu_control(self.fd, self.unit_id, EU1_SET_ISP, UVC_SET_CUR, menu._before_buf)
 
-            query_xu_control(self.fd, self.unit_id, EU1_SET_ISP, UVC_SET_CUR, to_buf(menu.value))
+            query_xu_control(self.fd, self.unit_id, EU1_SET_ISP, UVC_SET_CUR, menu._value_buf)
 
     def get_ctrls(self):
         return self.ctrls
@@ -1287,7 +1540,7 @@ LOGITECH_PERIPHERAL_PANTILT_RESET_PAN = b'\x01'
 LOGITECH_PERIPHERAL_PANTILT_RESET_TILT = b'\x02'
 LOGITECH_PERIPHERAL_PANTILT_RESET_BOTH = b'\x03'
 
-LOGITECH_PRESET_DEV_MATCH = [
+LOGITECH_PRESET_DEV_MATCH = frozenset([
     '046d:0853', # PTZ Pro
     '046d:0858', # Group camera
     '046d:085f', # PTZ Pro 2
@@ -1295,7 +1548,7 @@ LOGITECH_PRESET_DEV_MATCH = [
     '046d:0881', # Rally camera
     '046d:0888', # Rally camera
     '046d:0889', # Rally camera
-]
+])
 
 LOGITECH_PERIPHERAL_PANTILT_PRESET_SEL = 0x02
 LOGITECH_PERIPHERAL_PANTILT_PRESET_LEN = 1
@@ -1350,12 +1603,12 @@ LOGITECH_HW_CONTROL_LED1_FREQUENCY_OFFSET = 2
 # Logitech motor control v1 GUID 63610682-5070-49ab-b8cc-b3855e8d2256
 LOGITECH_MOTOR_CONTROL_V1_GUID = b'\x82\x06\x61\x63\x70\x50\xab\x49\xb8\xcc\xb3\x85\x5e\x8d\x22\x56'
 
-LOGITECH_MOTOR_CONTROL_FOCUS_DEV_MATCH = [
+LOGITECH_MOTOR_CONTROL_FOCUS_DEV_MATCH = frozenset([
     '046d:0809', # Webcam Pro 9000
     '046d:0990', # QuickCam Pro 9000
     '046d:0991', # QuickCam Pro for Notebooks
     '046d:0994', # QuickCam Orbit/Sphere AF
-]
+])
 LOGITECH_MOTOR_CONTROL_FOCUS_SEL = 0x03
 LOGITECH_MOTOR_CONTROL_FOCUS_LEN = 6
 
@@ -1365,14 +1618,14 @@ LOGITECH_MOTOR_CONTROL_FOCUS_DESC = 'Allows the control of focus motor movements
 # Logitech BRIO GUID 49e40215-f434-47fe-b158-0e885023e51b
 LOGITECH_BRIO_GUID = b'\x15\x02\xe4\x49\x34\xf4\xfe\x47\xb1\x58\x0e\x88\x50\x23\xe5\x1b'
 
-LOGITECH_BRIO_FOV_DEV_MATCH = [
+LOGITECH_BRIO_FOV_DEV_MATCH = frozenset([
     '046d:085e', # Brio
     '046d:0943', # Brio 500
     '046d:0946', # Brio 501
     '046d:0919', # Brio 505
     '046d:086b', # Brio 4K Stream Edition
     '046d:0944', # MX Brio
-]
+])
 LOGITECH_BRIO_FOV_SEL = 0x05
 LOGITECH_BRIO_FOV_LEN = 1
 LOGITECH_BRIO_FOV_OFFSET = 0
@@ -1396,6 +1649,8 @@ class LogitechCtrls:
         self.fd = fd
         self.usb_ids = find_usb_ids_in_sysfs(device)
         self.ctrls = []
+        # the longest Logitech ctrl is 6 bytes, the queries are synchronous so one buffer is enough
+        self.xu_buf = to_buf(bytes(8))
 
         self.get_device_controls()
 
@@ -1403,9 +1658,18 @@ class LogitechCtrls:
         return len(self.ctrls) != 0
 
     def get_device_controls(self):
-        peripheral_unit_id = find_unit_id_in_sysfs(self.device, LOGITECH_PERIPHERAL_GUID)
+        xu_units = find_xu_units_in_sysfs(self.device)
+
+        peripheral_unit_id = xu_units.get(LOGITECH_PERIPHERAL_GUID, 0)
+        peripheral_selectors = frozenset()
         if peripheral_unit_id != 0:
-            if try_xu_control(self.fd, peripheral_unit_id, LOGITECH_PERIPHERAL_LED1_SEL):
+            peripheral_selectors = probe_xu_selectors(self.fd, peripheral_unit_id, [
+                LOGITECH_PERIPHERAL_LED1_SEL,
+                LOGITECH_PERIPHERAL_PANTILT_REL_SEL,
+                LOGITECH_PERIPHERAL_PANTILT_RESET_SEL,
+                LOGITECH_PERIPHERAL_PANTILT_PRESET_SEL,
+            ])
+            if LOGITECH_PERIPHERAL_LED1_SEL in peripheral_selectors:
                 self.ctrls.extend([
                     LogitechCtrl(
                         'logitech_led1_mode',
@@ -1434,7 +1698,7 @@ class LogitechCtrls:
                         LOGITECH_PERIPHERAL_LED1_FREQUENCY_OFFSET,
                     ),
                 ])
-            if try_xu_control(self.fd, peripheral_unit_id, LOGITECH_PERIPHERAL_PANTILT_REL_SEL):
+            if LOGITECH_PERIPHERAL_PANTILT_REL_SEL in peripheral_selectors:
                 self.ctrls.extend([
                     LogitechCtrl(
                         'logitech_pan_relative',
@@ -1469,7 +1733,7 @@ class LogitechCtrls:
                         ],
                     ),
                 ])
-            if try_xu_control(self.fd, peripheral_unit_id, LOGITECH_PERIPHERAL_PANTILT_RESET_SEL):
+            if LOGITECH_PERIPHERAL_PANTILT_RESET_SEL in peripheral_selectors:
                 self.ctrls.extend([
                     LogitechCtrl(
                         'logitech_pantilt_reset',
@@ -1487,7 +1751,7 @@ class LogitechCtrls:
                         ],
                     ),
                 ])
-            if try_xu_control(self.fd, peripheral_unit_id, LOGITECH_PERIPHERAL_PANTILT_PRESET_SEL)\
+            if LOGITECH_PERIPHERAL_PANTILT_PRESET_SEL in peripheral_selectors\
                 and self.usb_ids in LOGITECH_PRESET_DEV_MATCH:
                 self.ctrls.extend([
                     LogitechCtrl(
@@ -1521,8 +1785,9 @@ class LogitechCtrls:
                     ),
                 ])
 
-        user_hw_unit_id = find_unit_id_in_sysfs(self.device, LOGITECH_USER_HW_CONTROL_V1_GUID)
-        if user_hw_unit_id != 0:
+        # the same LED1 ctrls, the peripheral unit is preferred
+        user_hw_unit_id = xu_units.get(LOGITECH_USER_HW_CONTROL_V1_GUID, 0)
+        if user_hw_unit_id != 0 and LOGITECH_PERIPHERAL_LED1_SEL not in peripheral_selectors:
             self.ctrls.extend([
                 LogitechCtrl(
                     'logitech_led1_mode',
@@ -1552,8 +1817,8 @@ class LogitechCtrls:
                 ),
             ])
 
-        motor_control_unit_id = find_unit_id_in_sysfs(self.device, LOGITECH_MOTOR_CONTROL_V1_GUID)
-        if motor_control_unit_id != 0 and self.usb_ids in LOGITECH_MOTOR_CONTROL_FOCUS_DEV_MATCH:
+        motor_control_unit_id = xu_units.get(LOGITECH_MOTOR_CONTROL_V1_GUID, 0) if self.usb_ids in LOGITECH_MOTOR_CONTROL_FOCUS_DEV_MATCH else 0
+        if motor_control_unit_id != 0:
             self.ctrls.extend([
                 LogitechCtrl(
                     'logitech_motor_focus',
@@ -1567,8 +1832,8 @@ class LogitechCtrls:
                 ),
             ])
 
-        brio_unit_id = find_unit_id_in_sysfs(self.device, LOGITECH_BRIO_GUID)
-        if brio_unit_id != 0 and self.usb_ids in LOGITECH_BRIO_FOV_DEV_MATCH:
+        brio_unit_id = xu_units.get(LOGITECH_BRIO_GUID, 0) if self.usb_ids in LOGITECH_BRIO_FOV_DEV_MATCH else 0
+        if brio_unit_id != 0:
             self.ctrls.extend([
                 LogitechCtrl(
                     'logitech_brio_fov',
@@ -1587,26 +1852,40 @@ class LogitechCtrls:
                 ),
             ])
 
+        self.ctrls_by_text_id = {c.text_id: c for c in self.ctrls}
+
+        # the ctrls at different offsets of the same selector share the queries
+        by_selector = {}
         for c in self.ctrls:
-            minimum_config = to_buf(bytes(c._len))
-            query_xu_control(self.fd, c._unit_id, c._selector, UVC_GET_MIN, minimum_config)
-            c.min = minimum_config[c._offset][0]
+            by_selector.setdefault((c._unit_id, c._selector), []).append(c)
 
-            maximum_config = to_buf(bytes(c._len))
-            query_xu_control(self.fd, c._unit_id, c._selector, UVC_GET_MAX, maximum_config)
-            c.max = maximum_config[c._offset][0]
+        for (unit_id, selector), ctrls in by_selector.items():
+            minimum_config = self.query_xu(unit_id, selector, UVC_GET_MIN)
+            for c in ctrls:
+                c.min = minimum_config[c._offset][0]
 
-            if c.type == 'button':
+            maximum_config = self.query_xu(unit_id, selector, UVC_GET_MAX)
+            for c in ctrls:
+                c.max = maximum_config[c._offset][0]
+
+            ctrls = [c for c in ctrls if c.type != 'button']
+            if not ctrls:
                 continue
 
-            current_config = to_buf(bytes(c._len))
-            query_xu_control(self.fd, c._unit_id, c._selector, UVC_GET_CUR, current_config)
-            c.value = current_config[c._offset][0]
+            current_config = self.query_xu(unit_id, selector, UVC_GET_CUR)
+            for c in ctrls:
+                c.value = current_config[c._offset][0]
 
-            if c.type == 'menu':
-                valmenu = find_by_value(c.menu, c.value)
-                if valmenu:
-                    c.value = valmenu.text_id
+                if c.type == 'menu':
+                    valmenu = find_by_value(c.menu, c.value)
+                    if valmenu:
+                        c.value = valmenu.text_id
+
+    # the result is valid until the next query
+    def query_xu(self, unit_id, selector, query):
+        ctypes.memset(self.xu_buf, 0, len(self.xu_buf))
+        query_xu_control(self.fd, unit_id, selector, query, self.xu_buf)
+        return self.xu_buf
 
 
     def setup_ctrls(self, params, errs):
@@ -1614,7 +1893,7 @@ class LogitechCtrls:
             return
 
         for k, v in params.items():
-            ctrl = find_by_text_id(self.ctrls, k)
+            ctrl = self.ctrls_by_text_id.get(k)
             if ctrl is None:
                 continue
             if ctrl.type == 'menu' or ctrl.type == 'button':
@@ -1630,20 +1909,19 @@ class LogitechCtrls:
                 continue
 
             if ctrl.type == 'button':
-                query_xu_control(self.fd, ctrl._unit_id, ctrl._selector, UVC_SET_CUR, to_buf(desired))
+                query_xu_control(self.fd, ctrl._unit_id, ctrl._selector, UVC_SET_CUR, menu.get_buf())
                 continue
 
-            current_config = to_buf(bytes(ctrl._len))
-            query_xu_control(self.fd, ctrl._unit_id, ctrl._selector, UVC_GET_CUR, current_config)
-            current_config[ctrl._offset] = desired
-            query_xu_control(self.fd, ctrl._unit_id, ctrl._selector, UVC_SET_CUR, current_config)
-            query_xu_control(self.fd, ctrl._unit_id, ctrl._selector, UVC_GET_CUR, current_config)
+            current_config = self.query_xu(ctrl._unit_id, ctrl._selector, UVC_GET_CUR)
+            # already set, skip the write and the verification
+            if current_config[ctrl._offset][0] != desired:
+                current_config[ctrl._offset] = desired
+                query_xu_control(self.fd, ctrl._unit_id, ctrl._selector, UVC_SET_CUR, current_config)
+                query_xu_control(self.fd, ctrl._unit_id, ctrl._selector, UVC_GET_CUR, current_config)
             current = current_config[ctrl._offset][0]
 
             if ctrl.type == 'menu':
-                desmenu = find_by_value(ctrl.menu, desired)
-                if desmenu:
-                    desired = desmenu.text_id
+                desired = menu.text_id
                 curmenu = find_by_value(ctrl.menu, current)
                 if curmenu:
                     current = curmenu.text_id
@@ -1659,9 +1937,9 @@ class LogitechCtrls:
 # Dell UltraSharp WB7022 GUID 23e49ed0-1178-4f31-ae52-d2fb8a8d3b48 in little-endian
 DELL_ULTRASHARP_GUID = b'\xd0\x9e\xe4\x23\x78\x11\x31\x4f\xae\x52\xd2\xfb\x8a\x8d\x3b\x48'
 
-DELL_ULTRASHARP_DEV_MATCH = [
+DELL_ULTRASHARP_DEV_MATCH = frozenset([
     '413c:c015',
-]
+])
 
 DELL_ULTRASHARP_SET = 0x01
 DELL_ULTRASHARP_GET = 0x02
@@ -1693,8 +1971,9 @@ class DellUltraSharpCtrls:
     def __init__(self, device, fd):
         self.device = device
         self.fd = fd
-        self.unit_id = find_unit_id_in_sysfs(device, DELL_ULTRASHARP_GUID)
         self.usb_ids = find_usb_ids_in_sysfs(device)
+        # the cheap usb id check comes first
+        self.unit_id = find_unit_id_in_sysfs(device, DELL_ULTRASHARP_GUID) if self.usb_ids in DELL_ULTRASHARP_DEV_MATCH else 0
         self.get_device_controls()
 
     def supported(self):
@@ -1768,13 +2047,14 @@ class DellUltraSharpCtrls:
                 ]
             ),
         ]
+        self.ctrls_by_text_id = {c.text_id: c for c in self.ctrls}
 
     def setup_ctrls(self, params, errs):
         if not self.supported():
             return
 
         for k, v in params.items():
-            ctrl = find_by_text_id(self.ctrls, k)
+            ctrl = self.ctrls_by_text_id.get(k)
             if ctrl is None:
                 continue
             menu = find_by_text_id(ctrl.menu, v)
@@ -1783,16 +2063,16 @@ class DellUltraSharpCtrls:
                 continue
             ctrl.value = menu.text_id
 
-            query_xu_control(self.fd, self.unit_id, DELL_ULTRASHARP_SET, UVC_SET_CUR, to_buf(menu.value))
+            query_xu_control(self.fd, self.unit_id, DELL_ULTRASHARP_SET, UVC_SET_CUR, menu.get_buf())
 
     def get_ctrls(self):
         return self.ctrls
 
 # AnkerWork C310 GUID 41769ea2-04de-e347-8b2b-f4341aff003b in little endian
 ANKERWORK_GUID = b'\xa2\x9e\x76\x41\xde\x04\x47\xe3\x8b\x2b\xf4\x34\x1a\xff\x00\x3b'
-ANKERWORK_DEV_MATCH = [
+ANKERWORK_DEV_MATCH = frozenset([
     '291a:3367',
-]
+])
 
 ## FOV settings commands
 ANKERWORK_FOV_SELECTOR = 0x10
@@ -1803,6 +2083,14 @@ ANKERWORK_FOV_65 = b'\x00\x01\x5f\x00\x00\x00\x00'
 ANKERWORK_FOV_78 = b'\x00\x01\x4e\x00\x00\x00\x00'
 ANKERWORK_FOV_95 = b'\x00\x01\x41\x00\x00\x00\x00'
 
+# the FOV settings as read back from GET_CUR
+ANKERWORK_FOV_NAMES = {
+    int.from_bytes(ANKERWORK_FOV_65, 'little'): '65°',
+    int.from_bytes(ANKERWORK_FOV_78, 'little'): '78°',
+    int.from_bytes(ANKERWORK_FOV_95, 'little'): '95°',
+    int.from_bytes(ANKERWORK_SOLO_FRAME, 'little'): 'auto',
+}
+
 ## Horizontal flip commands
 # FIXME: Nothing seems to work with this. I'm not really bothered by this.
 ANKERWORK_HOR_SELECTOR = 0x11
@@ -1868,6 +2156,17 @@ ANKERWORK_MIC_PICKUP_MODE_LENGTH = 0x1
 ANKERWORK_MIC_PICKUP_360 = 0x0
 ANKERWORK_MIC_PICKUP_90 = 0x5a
 
+# the GET_CUR values of the special ctrls, as little endian ints, to their displayed values
+ANKERWORK_DECODERS = {
+    'ankerwork_hdr': lambda v: 'on' if v == 1 else 'off',
+    'ankerwork_mic_noisered': lambda v: 'on' if v == 1 else 'off',
+    'ankerwork_face_focus': lambda v: 'on' if v == 1 else 'off',
+    'ankerwork_mic_pickup': lambda v: '90°' if v == ANKERWORK_MIC_PICKUP_90 else '360°',
+    'ankerwork_face_compensation': lambda v: AnkerWorkCtrls._map_int_to_comp(v),
+    'ankerwork_face_compensation_enable': lambda v: 'on' if v & 0xff == 1 else 'off',
+    'ankerwork_fov': lambda v: ANKERWORK_FOV_NAMES.get(v, '?'),
+}
+
 class AnkerWorkCtrl(BaseCtrl):
     def __init__(self, text_id, name, type, tooltip, selector, menu, length, min = None, max = None, default=None):
         super().__init__(text_id, name, type, tooltip=tooltip, menu=menu, min=min, max=max, default=default)
@@ -1878,8 +2177,9 @@ class AnkerWorkCtrls:
     def __init__(self, device, fd):
         self.device = device
         self.fd = fd
-        self.unit_id = find_unit_id_in_sysfs(device, ANKERWORK_GUID)
         self.usb_ids = find_usb_ids_in_sysfs(device)
+        # the cheap usb id check comes first
+        self.unit_id = find_unit_id_in_sysfs(device, ANKERWORK_GUID) if self.usb_ids in ANKERWORK_DEV_MATCH else 0
         self.get_device_controls()
 
     def supported(self):
@@ -1991,6 +2291,7 @@ class AnkerWorkCtrls:
                 ANKERWORK_HOR_LENGTH,
             ),
         ]
+        self.ctrls_by_text_id = {c.text_id: c for c in self.ctrls}
 
         for c in self.ctrls:
             if c.type == 'button':
@@ -1999,28 +2300,8 @@ class AnkerWorkCtrls:
             current_config = to_buf(bytes(c.length))
             query_xu_control(self.fd, self.unit_id, c.selector, UVC_GET_CUR, current_config)
             set_value = self._int_from_bytes(current_config)
-            if c.text_id in ['ankerwork_hdr', 'ankerwork_mic_noisered', 'ankerwork_face_focus']:
-                c.value = 'on' if set_value == 1 else 'off'
-            elif c.text_id == 'ankerwork_mic_pickup':
-                c.value = '90°' if set_value == ANKERWORK_MIC_PICKUP_90 else '360°'
-            elif c.text_id == 'ankerwork_face_compensation':
-                c.value = f'{self._map_int_to_comp(set_value):.1f} EV'
-            elif c.text_id == 'ankerwork_face_compensation_enable':
-                c.value = 'on' if set_value & 0xff == 1 else 'off'
-            elif c.text_id == 'ankerwork_fov':
-                if set_value == self._int_from_bytes(ANKERWORK_FOV_65):
-                    c.value = '65°'
-                elif set_value == self._int_from_bytes(ANKERWORK_FOV_78):
-                    c.value = '78°'
-                elif set_value == self._int_from_bytes(ANKERWORK_FOV_95):
-                    c.value = '95°'
-                elif set_value == self._int_from_bytes(ANKERWORK_SOLO_FRAME):
-                    c.value = 'auto'
-                else:
-                    c.value = '?'
-            else:
-                set_value = self._int_from_bytes(current_config)
-                c.value = set_value
+            decoder = ANKERWORK_DECODERS.get(c.text_id)
+            c.value = decoder(set_value) if decoder is not None else set_value
 
             if c.type == 'menu':
                 valmenu = find_by_value(c.menu, c.value)
@@ -2032,8 +2313,8 @@ class AnkerWorkCtrls:
         return int.from_bytes(bytes, byteorder='little', signed=False)
 
     @staticmethod
-    def _bytes_from_int(number):
-        return number.to_bytes(1, byteorder='little', signed=False)
+    def _bytes_from_int(number, length=1):
+        return number.to_bytes(length, byteorder='little', signed=False)
 
     @staticmethod
     def _map_comp_to_int(value: int) -> int:
@@ -2041,7 +2322,7 @@ class AnkerWorkCtrls:
         return value << 8
 
     @staticmethod
-    def _map_int_to_comp(value: int) -> float:
+    def _map_int_to_comp(value: int) -> int:
         return value >> 8
 
     def setup_ctrls(self, params, errs):
@@ -2049,7 +2330,7 @@ class AnkerWorkCtrls:
             return
 
         for k, v in params.items():
-            ctrl = find_by_text_id(self.ctrls, k)
+            ctrl = self.ctrls_by_text_id.get(k)
             if ctrl is None:
                 continue
 
@@ -2069,8 +2350,13 @@ class AnkerWorkCtrls:
                     desired = to_buf(menu.value)
             elif ctrl.type == 'integer':
                 if ctrl.text_id == 'ankerwork_face_compensation':
-                    cur_enable = self._int_from_bytes(current_config) & 0xff
-                    desired = to_buf(self._bytes_from_int(self._map_comp_to_int(int(v)) + cur_enable))
+                    cur_value = self._int_from_bytes(current_config)
+                    # it is already set, spare the SET_CUR
+                    if self._map_int_to_comp(cur_value) == int(v):
+                        ctrl.value = int(v)
+                        continue
+                    cur_enable = cur_value & 0xff
+                    desired = to_buf(self._bytes_from_int(self._map_comp_to_int(int(v)) + cur_enable, ctrl.length))
                 else:
                     desired = int(v)
             else:
@@ -2078,27 +2364,17 @@ class AnkerWorkCtrls:
                 continue
 
             if ctrl.type == 'button':
-                query_xu_control(self.fd, self.unit_id, ctrl.selector, UVC_SET_CUR, to_buf(desired))
+                query_xu_control(self.fd, self.unit_id, ctrl.selector, UVC_SET_CUR, to_scratch_buf(desired))
                 continue
 
+            # SET_CUR only, a GET_CUR readback into the desired buffer itself can't detect a failed write
+            query_xu_control(self.fd, self.unit_id, ctrl.selector, UVC_SET_CUR, desired)
 
-            current_config = desired
-            query_xu_control(self.fd, self.unit_id, ctrl.selector, UVC_SET_CUR, current_config)
-            query_xu_control(self.fd, self.unit_id, ctrl.selector, UVC_GET_CUR, current_config)
-            current = current_config
-
+            # desired is the written buffer, store the text_id of the menu instead
             if ctrl.type == 'menu':
-                desmenu = find_by_value(ctrl.menu, desired)
-                if desmenu:
-                    desired = desmenu.text_id
-                curmenu = find_by_value(ctrl.menu, current)
-                if curmenu:
-                    current = curmenu.text_id
-            if current != desired:
-                collect_warning( f'AnkerWorkCtrls: failed to set {k} to {desired}, current value {current}\n', errs)
-                continue
-
-            ctrl.value = desired
+                ctrl.value = menu.text_id
+            else:
+                ctrl.value = int(v)
 
     def get_ctrls(self):
         return self.ctrls
@@ -2109,6 +2385,7 @@ class V4L2Ctrl(BaseCtrl):
         self.v4l2_id = v4l2_id
         self.last_set = 0
         self.repeat = None
+        self.menu_by_value = None
 
 class V4L2Ctrls:
     to_type = {
@@ -2118,7 +2395,8 @@ class V4L2Ctrls:
         V4L2_CTRL_TYPE_INTEGER_MENU: 'menu',
         V4L2_CTRL_TYPE_BUTTON: 'button',
     }
-    strtrans = bytes.maketrans(b' -', b'__')
+    # lowercase too, to_text_id needs only one pass
+    strtrans = bytes.maketrans(b' -ABCDEFGHIJKLMNOPQRSTUVWXYZ', b'__abcdefghijklmnopqrstuvwxyz')
 
 
     def __init__(self, device, fd):
@@ -2129,7 +2407,7 @@ class V4L2Ctrls:
 
     def setup_ctrls(self, params, errs):
         for k, v in params.items():
-            ctrl = find_by_text_id(self.ctrls, k)
+            ctrl = self.ctrls_by_text_id.get(k)
             if ctrl is None:
                 continue
             intvalue = 0
@@ -2175,14 +2453,45 @@ class V4L2Ctrls:
         if ctrl.type != 'menu':
             ctrl.value = intvalue
         else:
-            menu = find_by_value(ctrl.menu, intvalue)
+            menu = ctrl.menu_by_value.get(intvalue)
             if menu is None:
                 collect_warning(f'V4L2Ctrls: Can\'t find {intvalue} in {[c.value for c in ctrl.menu]}', errs)
                 return
             ctrl.value = menu.text_id
 
+    def get_ctrl_values(self, qctrls):
+        values = {}
+        if len(qctrls) == 0:
+            return values
+
+        ext_ctrls = (v4l2_ext_control * len(qctrls))()
+        for ext_ctrl, qctrl in zip(ext_ctrls, qctrls):
+            ext_ctrl.id = qctrl.id
+        ext = v4l2_ext_controls(V4L2_CTRL_WHICH_CUR_VAL, len(qctrls))
+        ext.controls = ext_ctrls
+        try:
+            ioctl(self.fd, VIDIOC_G_EXT_CTRLS, ext)
+            for ext_ctrl in ext_ctrls:
+                values[ext_ctrl.id] = ext_ctrl.value
+            return values
+        except:
+            pass
+
+        # a single unreadable ctrl fails the whole batch, get them one by one
+        ctrl = v4l2_control()
+        for qctrl in qctrls:
+            ctrl.id = qctrl.id
+            ctrl.value = 0
+            try:
+                ioctl(self.fd, VIDIOC_G_CTRL, ctrl)
+            except:
+                logging.warning(f'V4L2Ctrls: Can\'t get ctrl {qctrl.name} value')
+            values[qctrl.id] = ctrl.value
+        return values
+
     def get_device_controls(self):
         ctrls = []
+        qctrls = []
         next_flag = V4L2_CTRL_FLAG_NEXT_CTRL | V4L2_CTRL_FLAG_NEXT_COMPOUND
         qctrl = v4l2_queryctrl(next_flag)
         while True:
@@ -2192,96 +2501,106 @@ class V4L2Ctrls:
                 break
             if qctrl.type in [V4L2_CTRL_TYPE_INTEGER, V4L2_CTRL_TYPE_BOOLEAN,
                 V4L2_CTRL_TYPE_MENU, V4L2_CTRL_TYPE_INTEGER_MENU, V4L2_CTRL_TYPE_BUTTON]:
+                qctrls.append(qctrl)
+            qctrl = v4l2_queryctrl(qctrl.id | next_flag)
+
+        # read all the current values with one VIDIOC_G_EXT_CTRLS,
+        # a write-only ctrl (eg. the uvc relative pan/tilt/zoom) would fail the whole batch, they get 0
+        values = self.get_ctrl_values([
+            q for q in qctrls
+            if q.type != V4L2_CTRL_TYPE_BUTTON and not q.flags & V4L2_CTRL_FLAG_WRITE_ONLY
+        ])
 
-                text_id = self.to_text_id(qctrl.name)
-                text = qctrl.name.decode()
-                ctrl_type = V4L2Ctrls.to_type.get(qctrl.type)
-                if ctrl_type == 'integer' and qctrl.minimum == 0 and qctrl.maximum == 1 and qctrl.step == 1:
-                    ctrl_type = 'boolean'
+        for qctrl in qctrls:
+            text_id = self.to_text_id(qctrl.name)
+            text = qctrl.name.decode()
+            ctrl_type = V4L2Ctrls.to_type.get(qctrl.type)
+            if ctrl_type == 'integer' and qctrl.minimum == 0 and qctrl.maximum == 1 and qctrl.step == 1:
+                ctrl_type = 'boolean'
 
-                if ctrl_type != 'button':
+            if ctrl_type != 'button':
+                v4l2ctrl = V4L2Ctrl(qctrl.id, text_id, text, ctrl_type, int(values.get(qctrl.id, 0)),
+                    qctrl.default, qctrl.minimum, qctrl.maximum, qctrl.step)
+            else:
+                v4l2ctrl = V4L2Ctrl(qctrl.id, text_id, text, ctrl_type, None, menu = [ BaseCtrlMenu(text_id, text, text_id) ])
+
+            v4l2ctrl.inactive = bool(qctrl.flags & V4L2_CTRL_FLAG_INACTIVE)
+            v4l2ctrl.readonly = bool(qctrl.flags & V4L2_CTRL_FLAG_READ_ONLY)
+            ctrl_info = get_v4l2_ctrl_info().get(qctrl.id)
+            if ctrl_info is not None:
+                v4l2ctrl.kernel_id = ctrl_info[0]
+                v4l2ctrl.tooltip = ctrl_info[1]
+
+            if qctrl.id in V4L2_CTRL_ZEROERS:
+                v4l2ctrl.zeroer = True
+                v4l2ctrl.default = 0
+            
+            if v4l2ctrl.step:
+                v4l2ctrl.step_big = v4l2ctrl.step * 20
+
+            if qctrl.id == V4L2_CID_WHITE_BALANCE_TEMPERATURE:
+                v4l2ctrl.scale_class = 'white-balance-temperature'
+                v4l2ctrl.format_value = lambda s,v: f'{v:.0f} K'
+
+            if qctrl.id == V4L2_CID_EXPOSURE_ABSOLUTE:
+                v4l2ctrl.scale_class = 'dark-to-light'
+                v4l2ctrl.format_value = lambda s,v: f'{v:.0f}00 µs'
+
+            if qctrl.id in [V4L2_CID_GAIN, V4L2_CID_ANALOGUE_GAIN, V4L2_CID_DIGITAL_GAIN]:
+                v4l2ctrl.scale_class = 'dark-to-light'
+
+            if qctrl.type in [V4L2_CTRL_TYPE_MENU, V4L2_CTRL_TYPE_INTEGER_MENU]:
+                v4l2ctrl.menu = []
+                qmenu = v4l2_querymenu(qctrl.id)
+                for i in range(qctrl.minimum, qctrl.maximum + 1):
                     try:
-                        ctrl = v4l2_control(qctrl.id)
-                        ioctl(self.fd, VIDIOC_G_CTRL, ctrl)
+                        qmenu.index = i
+                        ioctl(self.fd, VIDIOC_QUERYMENU, qmenu)
                     except:
-                        logging.warning(f'V4L2Ctrls: Can\'t get ctrl {qctrl.name} value')
-
-                    v4l2ctrl = V4L2Ctrl(qctrl.id, text_id, text, ctrl_type, int(ctrl.value),
-                        qctrl.default, qctrl.minimum, qctrl.maximum, qctrl.step)
-                else:
-                    v4l2ctrl = V4L2Ctrl(qctrl.id, text_id, text, ctrl_type, None, menu = [ BaseCtrlMenu(text_id, text, text_id) ])
-
-                v4l2ctrl.inactive = bool(qctrl.flags & V4L2_CTRL_FLAG_INACTIVE)
-                v4l2ctrl.readonly = bool(qctrl.flags & V4L2_CTRL_FLAG_READ_ONLY)
-                ctrl_info = V4L2_CTRL_INFO.get(qctrl.id)
-                if ctrl_info is not None:
-                    v4l2ctrl.kernel_id = ctrl_info[0]
-                    v4l2ctrl.tooltip = ctrl_info[1]
-
-                if qctrl.id in V4L2_CTRL_ZEROERS:
-                    v4l2ctrl.zeroer = True
-                    v4l2ctrl.default = 0
-                
-                if v4l2ctrl.step:
-                    v4l2ctrl.step_big = v4l2ctrl.step * 20
-
-                if qctrl.id == V4L2_CID_WHITE_BALANCE_TEMPERATURE:
-                    v4l2ctrl.scale_class = 'white-balance-temperature'
-                    v4l2ctrl.format_value = lambda s,v: f'{v:.0f} K'
-
-                if qctrl.id == V4L2_CID_EXPOSURE_ABSOLUTE:
-                    v4l2ctrl.scale_class = 'dark-to-light'
-                    v4l2ctrl.format_value = lambda s,v: f'{v:.0f}00 µs'
-
-                if qctrl.id in [V4L2_CID_GAIN, V4L2_CID_ANALOGUE_GAIN, V4L2_CID_DIGITAL_GAIN]:
-                    v4l2ctrl.scale_class = 'dark-to-light'
-
-                if qctrl.type in [V4L2_CTRL_TYPE_MENU, V4L2_CTRL_TYPE_INTEGER_MENU]:
-                    v4l2ctrl.menu = []
-                    for i in range(qctrl.minimum, qctrl.maximum + 1):
-                        try:
-                            qmenu = v4l2_querymenu(qctrl.id, i)
-                            ioctl(self.fd, VIDIOC_QUERYMENU, qmenu)
-                        except:
-                            continue
-                        if qctrl.type == V4L2_CTRL_TYPE_MENU:
-                            menu_text = qmenu.name.decode()
-                            menu_text_id = self.to_text_id(qmenu.name)
-                        else:
-                            menu_text_id = str(qmenu.value)
-                            menu_text = menu_text_id
-                        v4l2menu = BaseCtrlMenu(menu_text_id, menu_text, int(qmenu.index))
-                        v4l2ctrl.menu.append(v4l2menu)
-                        if v4l2ctrl.value == qmenu.index:
-                            v4l2ctrl.value = menu_text_id
-                        if v4l2ctrl.default == qmenu.index:
-                            v4l2ctrl.default = menu_text_id
-
-                    # when there is no menu item for the value
-                    # it should be None
-                    if isinstance(v4l2ctrl.value, int):
-                        v4l2ctrl.value = None
-                    if isinstance(v4l2ctrl.default, int):
-                        v4l2ctrl.default = None
-
-                ctrls.append(v4l2ctrl)
-            qctrl = v4l2_queryctrl(qctrl.id | next_flag)
+                        continue
+                    if qctrl.type == V4L2_CTRL_TYPE_MENU:
+                        menu_text = qmenu.name.decode()
+                        menu_text_id = self.to_text_id(qmenu.name)
+                    else:
+                        menu_text_id = str(qmenu.value)
+                        menu_text = menu_text_id
+                    v4l2menu = BaseCtrlMenu(menu_text_id, menu_text, int(qmenu.index))
+                    v4l2ctrl.menu.append(v4l2menu)
+                    if v4l2ctrl.value == qmenu.index:
+                        v4l2ctrl.value = menu_text_id
+                    if v4l2ctrl.default == qmenu.index:
+                        v4l2ctrl.default = menu_text_id
+
+                # when there is no menu item for the value
+                # it should be None
+                if isinstance(v4l2ctrl.value, int):
+                    v4l2ctrl.value = None
+                if isinstance(v4l2ctrl.default, int):
+                    v4l2ctrl.default = None
+
+                # the listener translates every event value with it
+                v4l2ctrl.menu_by_value = {m.value: m for m in v4l2ctrl.menu}
+
+            ctrls.append(v4l2ctrl)
 
         self.ctrls = ctrls
+        # setup_ctrls and the listener look up the ctrls by these ids
+        self.ctrls_by_text_id = {c.text_id: c for c in ctrls}
+        self.ctrls_by_v4l2_id = {c.v4l2_id: c for c in ctrls}
 
     def get_ctrls(self):
         return self.ctrls
 
     def to_text_id(self, text):
-        return text.lower().translate(V4L2Ctrls.strtrans, delete = b',&(.)/').replace(b'__', b'_').decode()
+        return text.translate(V4L2Ctrls.strtrans, delete = b',&(.)/').replace(b'__', b'_').decode()
 
     def find_by_v4l2_id(self, v4l2_id):
-        idx = find_idx(self.ctrls, lambda c: hasattr(c, 'v4l2_id') and c.v4l2_id == v4l2_id)
-        if idx is not None:
-            return self.ctrls[idx]
-        else:
-            None
+        return self.ctrls_by_v4l2_id.get(v4l2_id)
+
 
+# in seconds
+V4L2_LISTENER_POLL_TIMEOUT = 1
+V4L2_LISTENER_MAX_POLL_TIMEOUT = 4
 
 class V4L2Listener(Thread):
     def __init__(self, ctrls, fmt_ctrls, cb, err_cb):
@@ -2325,34 +2644,51 @@ class V4L2Listener(Thread):
             ctrl = updates[0]
             logging.info(f'V4L2Listener: {ctrl.text_id}={ctrl.value}')
             self.cb(ctrl)
+            return True
+        return False
 
     # thread start
     def run(self):
         event = v4l2_event()
+        # the fmt changes are polled, back off while the camera is idle
+        timeout = V4L2_LISTENER_POLL_TIMEOUT
         while not self.epoll.closed:
-            p = self.epoll.poll(1)
+            p = self.epoll.poll(timeout)
             if len(p) == 0:
                 if not self.epoll.closed:
-                    self.query_fmt_changes()
+                    if self.query_fmt_changes():
+                        timeout = V4L2_LISTENER_POLL_TIMEOUT
+                    else:
+                        timeout = min(timeout * 2, V4L2_LISTENER_MAX_POLL_TIMEOUT)
                 continue
+            timeout = V4L2_LISTENER_POLL_TIMEOUT
             (fd , v) = p[0]
             if v == select.POLLNVAL or v == select.POLLERR:
                 break
-            try:
-                ioctl(self.fd, VIDIOC_DQEVENT, event)
-            except Exception as e:
-                self.err_cb(collect_warning(f'VIDIOC_DQEVENT failed: {e}', []))
-                break
-            ctrl = self.ctrls.find_by_v4l2_id(event.id)
-            ctrl.inactive = bool(event.ctrl.flags & V4L2_CTRL_FLAG_INACTIVE)
-            ctrl.readonly = bool(event.ctrl.flags & V4L2_CTRL_FLAG_READ_ONLY)
-            errs = []
-            self.ctrls.set_ctrl_int_value(ctrl, int(event.ctrl.value), errs)
-            logging.info(f'VIDIOC_DQEVENT {ctrl.text_id}={ctrl.value} (pending: {event.pending})')
-            if errs:
-                self.err_cb(errs)
-                continue
-            self.cb(ctrl)
+            # drain the whole burst in one wakeup, the fd is blocking, so stop by the pending count
+            while True:
+                try:
+                    ioctl(self.fd, VIDIOC_DQEVENT, event)
+                except Exception as e:
+                    self.err_cb(collect_warning(f'VIDIOC_DQEVENT failed: {e}', []))
+                    return
+                self.handle_event(event)
+                if event.pending == 0:
+                    break
+
+    def handle_event(self, event):
+        ctrl = self.ctrls.find_by_v4l2_id(event.id)
+        (value,) = unpack_from('i', event, V4L2_EVENT_CTRL_VALUE_OFFSET)
+        (flags,) = unpack_from('I', event, V4L2_EVENT_CTRL_FLAGS_OFFSET)
+        ctrl.inactive = bool(flags & V4L2_CTRL_FLAG_INACTIVE)
+        ctrl.readonly = bool(flags & V4L2_CTRL_FLAG_READ_ONLY)
+        errs = []
+        self.ctrls.set_ctrl_int_value(ctrl, value, errs)
+        logging.info(f'VIDIOC_DQEVENT {ctrl.text_id}={ctrl.value} (pending: {event.pending})')
+        if errs:
+            self.err_cb(errs)
+            return
+        self.cb(ctrl)
 
     # thread stop
     def stop(self):
@@ -2369,17 +2705,22 @@ class V4L2FmtCtrls:
         self.device = device
         self.fd = fd
         self.ctrls = []
+        self.ctrls_by_text_id = {}
         self.pxf_ctrl = None
         self.res_ctrl = None
         self.fps_ctrl = None
+        self._fmt = None
         self.get_format_ctrls()
 
     def get_ctrls(self):
         return self.ctrls
 
     def setup_ctrls(self, params, errs):
+        # G_FMT only once per setup, S_FMT writes the negotiated format back into it,
+        # don't keep it between setups, the listener watches for changes made by other processes
+        self._fmt = None
         for k, v in params.items():
-            ctrl = find_by_text_id(self.ctrls, k)
+            ctrl = self.ctrls_by_text_id.get(k)
             if ctrl is None:
                 continue
             if ctrl.type == 'info':
@@ -2437,14 +2778,32 @@ class V4L2FmtCtrls:
                 BaseCtrlMenu(fps, fps, None) for fps in framerates
             ]) # fps menu should be dropdown
             self.ctrls.append(self.fps_ctrl)
+        self.ctrls_by_text_id = {c.text_id: c for c in self.ctrls}
 
-    def set_pixelformat(self, ctrl, pixelformat, errs):
-        fmt = v4l2_format()
-        fmt.type = V4L2_BUF_TYPE_VIDEO_CAPTURE
+    def get_setup_fmt(self, errs):
+        if self._fmt is None:
+            fmt = v4l2_format()
+            fmt.type = V4L2_BUF_TYPE_VIDEO_CAPTURE
+            try:
+                ioctl(self.fd, VIDIOC_G_FMT, fmt)
+            except Exception as e:
+                collect_warning(f'V4L2FmtCtrls: Can\'t get fmt {e}', errs)
+                return None
+            self._fmt = fmt
+        return self._fmt
+
+    def set_setup_fmt(self, fmt, errs):
         try:
-            ioctl(self.fd, VIDIOC_G_FMT, fmt)
+            ioctl(self.fd, VIDIOC_S_FMT, fmt)
         except Exception as e:
-            collect_warning(f'V4L2FmtCtrls: Can\'t get fmt {e}', errs)
+            self._fmt = None
+            collect_warning(f'V4L2FmtCtrls: Can\'t set fmt {e}', errs)
+            return False
+        return True
+
+    def set_pixelformat(self, ctrl, pixelformat, errs):
+        fmt = self.get_setup_fmt(errs)
+        if fmt is None:
             return
 
         if pixelformat == pxf2str(fmt.fmt.pix.pixelformat):
@@ -2452,10 +2811,7 @@ class V4L2FmtCtrls:
         
         fmt.fmt.pix.pixelformat = str2pxf(pixelformat)
 
-        try:
-            ioctl(self.fd, VIDIOC_S_FMT, fmt)
-        except Exception as e:
-            collect_warning(f'V4L2FmtCtrls: Can\'t set fmt {e}', errs)
+        if not self.set_setup_fmt(fmt, errs):
             return
 
         if pxf2str(fmt.fmt.pix.pixelformat) != pixelformat:
@@ -2465,12 +2821,8 @@ class V4L2FmtCtrls:
         ctrl.value = pixelformat
 
     def set_resolution(self, ctrl, resolution, errs):
-        fmt = v4l2_format()
-        fmt.type = V4L2_BUF_TYPE_VIDEO_CAPTURE
-        try:
-            ioctl(self.fd, VIDIOC_G_FMT, fmt)
-        except Exception as e:
-            collect_warning(f'V4L2FmtCtrls: Can\'t get fmt {e}', errs)
+        fmt = self.get_setup_fmt(errs)
+        if fmt is None:
             return
 
         if wh2str(fmt.fmt.pix) == resolution:
@@ -2478,10 +2830,7 @@ class V4L2FmtCtrls:
 
         str2wh(resolution, fmt.fmt.pix)
 
-        try:
-            ioctl(self.fd, VIDIOC_S_FMT, fmt)
-        except Exception as e:
-            collect_warning(f'V4L2FmtCtrls: Can\'t set fmt {e}', errs)
+        if not self.set_setup_fmt(fmt, errs):
             return
 
         if wh2str(fmt.fmt.pix) != resolution:
@@ -2555,7 +2904,7 @@ class V4L2FmtCtrls:
         return fmts
 
     def get_resolutions(self, pixelformat):
-        resolutions = []
+        sizes = []
         frm = v4l2_frmsizeenum()
         frm.pixel_format = pixelformat
         while True:
@@ -2565,10 +2914,10 @@ class V4L2FmtCtrls:
                 break
             if frm.type != V4L2_FRMSIZE_TYPE_DISCRETE:
                 break
-            resolutions.append(wh2str(frm.discrete))
+            sizes.append((frm.discrete.width, frm.discrete.height))
             frm.index += 1
-        resolutions.sort(key=lambda r: list(map(int, r.split('x'))), reverse=True)
-        return resolutions
+        sizes.sort(reverse=True)
+        return [f'{w}x{h}' for w, h in sizes]
 
     def get_framerates(self, pixelformat, width, height):
         framerates = []
@@ -2596,10 +2945,16 @@ class V4L2FmtCtrls:
         return cap
 
 def str2pxf(str):
-    return ord(str[0]) | (ord(str[1]) << 8) | (ord(str[2]) << 16) | (ord(str[3]) << 24)
+    pxf = FOURCC_CODES.get(str)
+    if pxf is not None:
+        return pxf
+    return int.from_bytes(str[:4].encode('latin-1'), 'little')
 
 def pxf2str(pxf):
-    return chr(pxf & 0xff) + chr(pxf >> 8 & 0xff) + chr(pxf >> 16 & 0xff) + chr(pxf >> 24 & 0xff)
+    name = FOURCC_NAMES.get(pxf)
+    if name is not None:
+        return name
+    return pxf.to_bytes(4, 'little').decode('latin-1')
 
 def wh2str(wh):
     return f'{wh.width}x{wh.height}'
@@ -2729,16 +3084,36 @@ class ColorPreset:
 
             self.cam_ctrls.setup_ctrls({**self.defaults, **menu.presets}, errs)
 
+SYSTEMD_SERVICE_TEMPLATE = """[Unit]
+Description=CameraCtrls daemon - restore control values
+
+[Service]
+Type=simple
+ExecStart={script_path}/cameractrlsd.py
+
+[Install]
+WantedBy=graphical-session.target
+"""
+
+# the environment doesn't change while running, probe it once per process
+@functools.lru_cache(maxsize=None)
+def systemd_available():
+    return os.path.exists('/bin/systemctl')
+
+@functools.lru_cache(maxsize=None)
+def portal_available():
+    return 'FLATPAK_ID' in os.environ or 'SNAP' in os.environ
+
+# the systemctl is-active results, CameraCtrls is built on every device (re)open,
+# SystemdSaver keeps them up to date when it enables or disables the service
+systemd_service_states = {}
+
 class SystemdSaver:
     def __init__(self, cam_ctrls):
         self.systemd_user_dir = os.path.expanduser('~/.config/systemd/user')
         self.service_file = 'cameractrlsd.service'
 
         self.cam_ctrls = cam_ctrls
-        if not self.systemd_available():
-            self.ctrls = []
-            return
-
         self.ctrls = [
             BaseCtrl('systemd_cameractrlsd', 'Start with Systemd', 'boolean',
                 tooltip = 'Start cameractrlsd with Systemd to restore Preset 1 at device connection',
@@ -2747,12 +3122,15 @@ class SystemdSaver:
             )
         ]
 
-    def systemd_available(self):
-        return os.path.exists('/bin/systemctl')
-
     def is_service_active(self):
-        return os.path.exists(os.path.join(self.systemd_user_dir, self.service_file)) and \
-            subprocess.run(["systemctl", "--user", "is-active", self.service_file], capture_output=True).returncode == 0
+        service_path = os.path.join(self.systemd_user_dir, self.service_file)
+        if not os.path.exists(service_path):
+            return False
+        active = systemd_service_states.get(service_path)
+        if active is None:
+            active = subprocess.run(["systemctl", "--user", "is-active", self.service_file], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+            systemd_service_states[service_path] = active
+        return active
 
     def get_ctrls(self):
         return self.ctrls
@@ -2769,22 +3147,32 @@ class SystemdSaver:
                 self.disable_systemd_service(errs)
 
     def create_systemd_service(self, ctrl, errs):
-        service_file_str = self.get_service_file(sys.path[0])
+        service_file_str = self.get_service_file(get_install_dir())
 
         os.makedirs(self.systemd_user_dir, mode=0o755, exist_ok=True)
 
-        with open(os.path.join(self.systemd_user_dir, self.service_file), 'w', encoding="utf-8") as f:
-            f.write(service_file_str)
+        # write it next to the old one and rename, systemd never sees a truncated unit
+        service_path = os.path.join(self.systemd_user_dir, self.service_file)
+        tmp_path = f'{service_path}.tmp'
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, service_file_str.encode('utf-8'))
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, service_path)
 
-        pdr = subprocess.run(["systemctl", "--user", "daemon-reload"], capture_output=True)
+        pdr = subprocess.run(["systemctl", "--user", "daemon-reload"], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
         if pdr.returncode:
             errs.extend(pdr.stderr.decode().splitlines())
 
-        pen = subprocess.run(["systemctl", "--user", "enable", "--now", self.service_file], capture_output=True)
+        pen = subprocess.run(["systemctl", "--user", "enable", "--now", self.service_file], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
         if pen.returncode:
             errs.extend(pen.stderr.decode().splitlines())
+        else:
+            # a Type=simple start succeeds even if the daemon dies right away, so check it
+            pen = subprocess.run(["systemctl", "--user", "is-active", self.service_file], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
-        pen = subprocess.run(["systemctl", "--user", "is-active", "--now", self.service_file], capture_output=True)
+        systemd_service_states[service_path] = pen.returncode == 0
         if pen.returncode:
             ctrl.value = False
 
@@ -2792,22 +3180,17 @@ class SystemdSaver:
             errs.extend(pen.stdout.decode().splitlines())
 
     def disable_systemd_service(self, errs):
-        p = subprocess.run(["systemctl", "--user", "disable", "--now", self.service_file], capture_output=True)
+        p = subprocess.run(["systemctl", "--user", "disable", "--now", self.service_file], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        service_path = os.path.join(self.systemd_user_dir, self.service_file)
         if p.returncode:
+            systemd_service_states.pop(service_path, None)
             errs.extend(p.stderr.decode().splitlines())
+        else:
+            systemd_service_states[service_path] = False
 
 
     def get_service_file(self, script_path):
-        return f"""[Unit]
-Description=CameraCtrls daemon - restore control values
-
-[Service]
-Type=simple
-ExecStart={script_path}/cameractrlsd.py
-
-[Install]
-WantedBy=graphical-session.target
-"""
+        return SYSTEMD_SERVICE_TEMPLATE.format(script_path=script_path)
 
 class ConfigPreset:
     def __init__(self, cam_ctrls):
@@ -2837,6 +3220,10 @@ class ConfigPreset:
                 reopener = True,
             )
         ]
+        # load_1 -> ('load', '1')
+        self.menu_ops = {m.text_id: tuple(m.text_id.split('_')) for m in self.ctrls[0].menu}
+        # built on the first save, the cam_ctrls are still being built here
+        self.restorable_ctrls = None
 
     def get_ctrls(self):
         return self.ctrls
@@ -2850,17 +3237,23 @@ class ConfigPreset:
             if menu is None:
                 collect_warning(f'ConfigPreset: Can\'t find {v} in {[c.text_id for c in ctrl.menu]}', errs)
                 continue
-            [op, preset_num] = menu.text_id.split('_')
+            (op, preset_num) = self.menu_ops[menu.text_id]
             if op == 'load':
                 self.load_preset(self.cam_ctrls.device, preset_num, errs)
             elif op == 'save':
                 self.save_preset(self.cam_ctrls.device, preset_num, errs)
 
     def get_claimed_controls(self):
+        # the type and unrestorable don't change, inactive, readonly and value do (see V4L2Listener)
+        if self.restorable_ctrls is None:
+            self.restorable_ctrls = [
+                c for c in self.cam_ctrls.get_ctrls()
+                if c.type != 'info' and not c.unrestorable
+            ]
         return {
             c.text_id: c.value
-            for c in self.cam_ctrls.get_ctrls()
-            if not c.inactive and not c.readonly and c.value is not None and c.type != 'info' and not c.unrestorable
+            for c in self.restorable_ctrls
+            if not c.inactive and not c.readonly and c.value is not None
         }
 
     def load_preset(self, device, preset_num, errs):
@@ -2869,30 +3262,95 @@ class ConfigPreset:
             collect_warning(f'ConfigPreset: preset file {filename} not found', errs)
             return
 
-        config = configparser.ConfigParser()
-        config.read(filename)
+        try:
+            config = read_ini_cached(filename)
+        except Exception as e:
+            collect_warning(f'ConfigPreset: can\'t read {filename}: {e}', errs)
+            return
         preset = f'preset_{preset_num}'
         if preset not in config:
             collect_warning(f'ConfigPreset: {preset} not found in {filename}', errs)
             return
         
-        for ctrl in config[preset]:
-            self.cam_ctrls.setup_ctrls({ctrl: config[preset][ctrl]}, errs)
+        # the presets are saved in the order of get_ctrls, so one call keeps the setting order
+        self.cam_ctrls.setup_ctrls(dict(config[preset]), errs)
 
     def save_preset(self, device, preset_num, errs):
         try:
-            configdir = get_configdir()
-            os.makedirs(configdir, mode=0o755, exist_ok=True)
-
             filename = get_configfilename(device)
-            config = configparser.ConfigParser()
-            config.read(filename)
+            if os.path.exists(filename):
+                # copy it, the cached one shouldn't change if the write fails
+                config = dict(read_ini_cached(filename))
+            else:
+                os.makedirs(get_configdir(), mode=0o755, exist_ok=True)
+                config = {}
             config[f'preset_{preset_num}'] = self.get_claimed_controls()
-            with open(filename, 'w') as configfile:
-                config.write(configfile)
+            write_ini(filename, config)
         except Exception as e:
             collect_warning(f'ConfigPreset: save_preset failed: {e}', errs)
 
+# the preset files in the configparser format, only the parts that save_preset writes:
+# [section] headers, key = value lines, and # or ; comments, the keys are case-insensitive
+def read_ini(filename):
+    config = {}
+    section = None
+    with open(filename, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line[0] in '#;':
+                continue
+            if line[0] == '[' and line[-1] == ']':
+                section = config.setdefault(line[1:-1], {})
+                continue
+            key, sep, value = line.partition('=')
+            if section is None or not sep:
+                continue
+            section[key.rstrip().lower()] = value.lstrip()
+    return config
+
+def write_ini(filename, config):
+    lines = []
+    for section, items in config.items():
+        lines.append(f'[{section}]\n')
+        lines.extend(f'{key} = {value}\n' for key, value in items.items())
+        lines.append('\n')
+
+    # write it next to the old one and rename, a failed save can't leave a half written file
+    # the symlink target is replaced and the mode is kept, as with an in-place rewrite
+    real_filename = os.path.realpath(filename)
+    tmp_filename = f'{real_filename}.tmp'
+    try:
+        mode = os.stat(real_filename).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = None
+    fd = os.open(tmp_filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        if mode is not None:
+            os.fchmod(fd, mode)
+        os.write(fd, ''.join(lines).encode('utf-8'))
+    finally:
+        os.close(fd)
+    os.replace(tmp_filename, real_filename)
+    # cache it as read_ini would parse it back, not the caller's dict with its raw values
+    cached = {section: {str(key).lower(): str(value) for key, value in items.items()} for section, items in config.items()}
+    ini_cache[filename] = (ini_stat_key(filename), cached)
+
+# the parsed preset files, they are parsed again only when the files change
+ini_cache = {}
+
+def ini_stat_key(filename):
+    st = os.stat(filename)
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+def read_ini_cached(filename):
+    key = ini_stat_key(filename)
+    cached = ini_cache.get(filename)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    config = read_ini(filename)
+    ini_cache[filename] = (key, config)
+    return config
+
 def find_symlink_in(dir, paths):
     for path in paths:
         if not os.path.isdir(path):
@@ -2904,7 +3362,14 @@ def find_symlink_in(dir, paths):
 
 # remove in 0.7.0
 # see https://github.com/soyersoyer/cameractrls/pull/50
+migrated_dev_ids = set()
+
 def migrate_old_config(dev_id):
+    # it is enough to try it once per process
+    if dev_id in migrated_dev_ids:
+        return
+    migrated_dev_ids.add(dev_id)
+
     xdg_config = os.getenv("XDG_CONFIG_HOME")
     if not xdg_config:
         return
@@ -2922,6 +3387,7 @@ def migrate_old_config(dev_id):
     except Exception as e:
         logging.debug(f'ConfigPreset: migrate_old_config failed: {e}')
 
+@functools.lru_cache(maxsize=None)
 def get_configdir():
     config_dir_base = os.path.expanduser(os.getenv("XDG_CONFIG_HOME", '~/.config'))
     return os.path.join(config_dir_base, 'hu.irl.cameractrls')
@@ -2945,10 +3411,6 @@ def set_repeat_interval(ctrl, e2e_ns):
 class DesktopPortal():
     def __init__(self, ctrls):
         self.cam_ctrls = ctrls
-        if not self.portal_available():
-            self.ctrls = []
-            return
-
         self.ctrls = [
             BaseCtrl('desktop_portal_cameractrlsd', 'Start with Desktop Portal (re-login required)', 'button',
                 tooltip = 'Start cameractrlsd with Desktop Portal to restore Preset 1 at device connection\nRe-login required to start the daemon',
@@ -2977,11 +3439,9 @@ class DesktopPortal():
             else:
                 self.request_autostart(False, errs)
 
-    def portal_available(self):
-        return 'FLATPAK_ID' in os.environ or 'SNAP' in os.environ
-
     def receive_autostart(self, connection, sender_name, object_path, interface_name, signal_name, parameters, user_data):
-        logging.debug(f'DesktopPortal: receive_autostart: {parameters[1]}')
+        if logging.root.isEnabledFor(logging.DEBUG):
+            logging.debug(f'DesktopPortal: receive_autostart: {parameters[1]}')
 
     def request_autostart(self, is_enabled, errs):
         from gi.repository import Gio, GLib
@@ -3015,6 +3475,9 @@ class PTZController():
     def __init__(self, ctrls):
         self.ctrls = ctrls
         v4l_ctrls = ctrls.v4l_ctrls
+        # the absolute and speed ctrls are all V4L2 ones, the steps are set
+        # at input event rate, so skip the dispatch to every other ctrl group
+        self.v4l_ctrls = v4l_ctrls
 
         self.zoom_absolute = v4l_ctrls.find_by_v4l2_id(V4L2_CID_ZOOM_ABSOLUTE)
         self.pan_absolute = v4l_ctrls.find_by_v4l2_id(V4L2_CID_PAN_ABSOLUTE)
@@ -3039,7 +3502,7 @@ class PTZController():
             control_size = (control.max - control.min) // control.step
             value = control.min + round(percent * control_size) * control.step
             if value != control.value:
-                self.ctrls.setup_ctrls({control.text_id: value}, errs)
+                self.v4l_ctrls.setup_ctrls({control.text_id: value}, errs)
         return 0
 
     def do_step(self, step, errs, control):
@@ -3049,7 +3512,7 @@ class PTZController():
             des_value = control.value + act_step
             value = min(max(des_value, control.min), control.max)
             if value != control.value:
-                self.ctrls.setup_ctrls({control.text_id: value}, errs)
+                self.v4l_ctrls.setup_ctrls({control.text_id: value}, errs)
                 control.last_set = now
             if des_value != value:
                 return 1
@@ -3060,7 +3523,7 @@ class PTZController():
             cur_step = (control.step or 1) * step
             value = min(max(cur_step, control.min), control.max)
             if value != control.value:
-                self.ctrls.setup_ctrls({control.text_id: value}, errs)
+                self.v4l_ctrls.setup_ctrls({control.text_id: value}, errs)
         return 0
 
     def do_zoom_percent(self, percent, errs):
@@ -3121,6 +3584,9 @@ class CameraCtrls:
     def __init__(self, device, fd):
         self.device = device
         self.fd = fd
+        # the device node and the fd may belong to another camera since the last open
+        clear_sysfs_cache()
+        xu_ctrl_lengths.clear()
         self.v4l_ctrls = V4L2Ctrls(device, fd)
         self.fmt_ctrls = V4L2FmtCtrls(device, fd)
         self.ctrls = [
@@ -3130,11 +3596,21 @@ class CameraCtrls:
             LogitechCtrls(device, fd),
             DellUltraSharpCtrls(device, fd),
             AnkerWorkCtrls(device, fd),
-            SystemdSaver(self),
+        ]
+        # the savers are only built where they can work
+        if systemd_available():
+            self.ctrls.append(SystemdSaver(self))
+        self.ctrls += [
             ColorPreset(self),
             ConfigPreset(self),
-            DesktopPortal(self),
         ]
+        if portal_available():
+            self.ctrls.append(DesktopPortal(self))
+        self.ctrl_pages = None
+        # the first one wins, like in find_by_text_id
+        self.ctrls_by_text_id = {}
+        for c in self.get_ctrls():
+            self.ctrls_by_text_id.setdefault(c.text_id, c)
 
     def has_ptz(self):
         return any([
@@ -3174,10 +3650,12 @@ class CameraCtrls:
                     print()
 
     def setup_ctrls(self, params, errs):
-        logging.debug(f'CameraCtrls.setup_ctrls: {params}')
+        # don't format the params when debug logging is off
+        if logging.root.isEnabledFor(logging.DEBUG):
+            logging.debug(f'CameraCtrls.setup_ctrls: {params}')
         for c in self.ctrls:
             c.setup_ctrls(params, errs)
-        unknown_ctrls = list(set(params.keys()) - set([c.text_id for c in self.get_ctrls()]))
+        unknown_ctrls = [k for k in params if k not in self.ctrls_by_text_id]
         if len(unknown_ctrls) > 0:
             collect_warning(f'CameraCtrls: can\'t find {unknown_ctrls} controls', errs)
 
@@ -3188,9 +3666,13 @@ class CameraCtrls:
         return ctrls
 
     def get_ctrl_by_text_id(self, text_id):
-        return find_by_text_id(self.get_ctrls(), text_id)
+        return self.ctrls_by_text_id.get(text_id)
 
     def get_ctrl_pages(self):
+        # the ctrls don't change after the init, build the pages only once
+        if self.ctrl_pages is not None:
+            return self.ctrl_pages
+
         ctrls = self.get_ctrls()
         pages = [
             CtrlPage('Basic', [
@@ -3325,6 +3807,7 @@ class CameraCtrls:
             page.categories = [cat for cat in page.categories if len(cat.ctrls)]
         pages = [page for page in pages if len(page.categories)]
 
+        self.ctrl_pages = pages
         return pages
 
     def subscribe_events(self, cb, err_cb):
@@ -3346,6 +3829,7 @@ def usage():
     print(f'  {sys.argv[0]} -c brightness=128,kiyo_pro_hdr=on,kiyo_pro_fov=wide')
 
 def main():
+    import getopt
     try:
         arguments, values = getopt.getopt(sys.argv[1:], 'hd:lLc:', ['help', 'list', 'list-devices'])
     except getopt.error as err:
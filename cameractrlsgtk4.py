@@ -245,9 +245,8 @@ class CameraCtrlsWindow(Gtk.ApplicationWindow):
         )
         self.device = device
         self.ptz_controllers = PTZHWControllers(self.device.path,
-            lambda check, p, i: GLib.timeout_add(300, check, p, i),
-            lambda err: self.notify(err),
-            lambda i: self.ptz_lb.get_row_at_index(i).get_child().set_active(False),
+            lambda err: GLib.idle_add(self.notify, err),
+            lambda i: GLib.idle_add(lambda: self.ptz_lb.get_row_at_index(i).get_child().set_active(False)),
         )
         self.ptz_model.splice(0, self.ptz_model.get_n_items(), self.ptz_controllers.get_names())
         for i in range(self.ptz_model.get_n_items()):
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+import ctypes, os, sys, tempfile, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cameractrls
+
+
+# an xu register file in place of the camera, keyed by selector
+class FakeXU:
+    def __init__(self):
+        self.regs = {}
+        self.sets = []
+
+    def query(self, fd, unit_id, selector, query, data):
+        if query == cameractrls.UVC_SET_CUR:
+            self.regs[selector] = bytes(data)
+            self.sets.append(selector)
+        elif query == cameractrls.UVC_GET_CUR:
+            reg = self.regs.get(selector, bytes(len(data)))
+            ctypes.memmove(data, reg, min(len(reg), len(data)))
+
+
+class AnkerWorkCtrlsTest(unittest.TestCase):
+    def setUp(self):
+        self.xu = FakeXU()
+        self.orig_query_xu_control = cameractrls.query_xu_control
+        cameractrls.query_xu_control = self.xu.query
+
+        self.ctrls = cameractrls.AnkerWorkCtrls.__new__(cameractrls.AnkerWorkCtrls)
+        self.ctrls.fd = -1
+        self.ctrls.unit_id = 1
+        self.ctrls.usb_ids = next(iter(cameractrls.ANKERWORK_DEV_MATCH))
+        self.ctrls.get_device_controls()
+
+    def tearDown(self):
+        cameractrls.query_xu_control = self.orig_query_xu_control
+
+    def get_ctrl(self, text_id):
+        return self.ctrls.ctrls_by_text_id[text_id]
+
+    def test_face_compensation_write_stores_int(self):
+        errs = []
+        self.ctrls.setup_ctrls({'ankerwork_face_compensation': '50'}, errs)
+        self.assertEqual(errs, [])
+        self.assertEqual(self.xu.sets, [cameractrls.ANKERWORK_FACE_EXPOSURE_COMP_SELECTOR])
+        value = self.get_ctrl('ankerwork_face_compensation').value
+        self.assertIsInstance(value, int)
+        self.assertEqual(value, 50)
+
+    def test_face_compensation_unchanged_skips_write(self):
+        errs = []
+        self.ctrls.setup_ctrls({'ankerwork_face_compensation': '0'}, errs)
+        self.assertEqual(self.xu.sets, [])
+        self.assertEqual(self.get_ctrl('ankerwork_face_compensation').value, 0)
+
+    def test_menu_write_stores_text_id(self):
+        errs = []
+        self.ctrls.setup_ctrls({'ankerwork_fov': '78', 'ankerwork_hdr': 'on'}, errs)
+        self.assertEqual(errs, [])
+        self.assertEqual(self.get_ctrl('ankerwork_fov').value, '78')
+        self.assertEqual(self.get_ctrl('ankerwork_hdr').value, 'on')
+
+
+class IniTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, 'cam.ini')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        cameractrls.ini_cache.clear()
+
+    def test_cached_config_matches_parsed(self):
+        config = {'preset_1': {'Brightness': 128, 'auto': True}}
+        cameractrls.write_ini(self.filename, config)
+        config['preset_1']['brightness'] = 0
+        cached = cameractrls.read_ini_cached(self.filename)
+        self.assertEqual(cached, {'preset_1': {'brightness': '128', 'auto': 'True'}})
+        self.assertEqual(cached, cameractrls.read_ini(self.filename))
+
+    def test_keeps_mode_and_symlink(self):
+        target = os.path.join(self.tmpdir.name, 'target.ini')
+        cameractrls.write_ini(target, {'preset_1': {'a': 1}})
+        os.chmod(target, 0o600)
+        os.symlink(target, self.filename)
+        cameractrls.write_ini(self.filename, {'preset_1': {'a': 2}})
+        self.assertTrue(os.path.islink(self.filename))
+        self.assertEqual(os.stat(target).st_mode & 0o777, 0o600)
+        self.assertEqual(cameractrls.read_ini(target), {'preset_1': {'a': '2'}})
+
+
+# an interface descriptor, a class specific extension unit and an endpoint descriptor
+def interface_desc(cls, subcls):
+    return bytes([9, cameractrls.USB_DT_INTERFACE, 0, 0, 1, cls, subcls, 0, 0])
+
+def xu_desc(unit_id, guid):
+    return bytes([24, cameractrls.USB_DT_CS_INTERFACE, cameractrls.UVC_VC_EXTENSION_UNIT, unit_id]) + guid + bytes(4)
+
+ENDPOINT_DESC = bytes([7, 0x05, 0x81, 0x03, 0x10, 0x00, 0x08])
+
+
+class FindXUUnitsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, 'descriptors')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        cameractrls.clear_sysfs_cache()
+
+    def find_units(self, descriptors):
+        with open(self.filename, 'wb') as f:
+            f.write(descriptors)
+        cameractrls.clear_sysfs_cache()
+        return cameractrls.find_xu_units_in_file(self.filename)
+
+    def test_video_class(self):
+        units = self.find_units(
+            interface_desc(cameractrls.USB_CLASS_VIDEO, cameractrls.UVC_SC_VIDEOCONTROL) +
+            xu_desc(3, cameractrls.ANKERWORK_GUID) + ENDPOINT_DESC
+        )
+        self.assertEqual(units, {cameractrls.ANKERWORK_GUID: 3})
+
+    def test_vendor_class(self):
+        units = self.find_units(
+            interface_desc(cameractrls.USB_CLASS_VENDOR_SPEC, cameractrls.UVC_SC_VIDEOCONTROL) +
+            xu_desc(4, cameractrls.ANKERWORK_GUID) + ENDPOINT_DESC
+        )
+        self.assertEqual(units, {cameractrls.ANKERWORK_GUID: 4})
+
+    def test_other_interface(self):
+        # an audio control interface, its class specific descriptors are not extension units
+        units = self.find_units(
+            interface_desc(0x01, 0x01) + xu_desc(5, cameractrls.ANKERWORK_GUID)
+        )
+        self.assertEqual(units, {})
+
+
+if __name__ == '__main__':
+    unittest.main()